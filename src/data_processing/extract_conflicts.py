@@ -1,20 +1,76 @@
-import json
+from multiprocessing import Pool
+
+import orjson
+import mmap
+import os
+
+CHUNK_SIZE = 64 << 20  # Bytes lidos por tarefa de cada worker
+
+
+def _keyword_variants(keyword_lc):
+    # Forma do keyword como aparece no JSON bruto (ex.: "/" pode vir escapado como "\/")
+    return {keyword_lc.encode('utf-8'), orjson.dumps(keyword_lc)[1:-1], keyword_lc.replace('/', '\\/').encode('utf-8')}
+
+
+def _chunk_boundaries(input_file, chunk_size):
+    """Divide o arquivo em intervalos de bytes que terminam em quebras de linha."""
+    size = os.path.getsize(input_file)
+    if size == 0:
+        return []
+
+    with open(input_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        boundaries = []
+        lo = 0
+        while lo < size:
+            newline = mm.find(b'\n', min(lo + chunk_size, size) - 1)
+            hi = size if newline == -1 else newline + 1
+            boundaries.append((lo, hi))
+            lo = hi
+        return boundaries
+
+
+def _filter_chunk(task):
+    """Retorna os registros de um intervalo do arquivo cujo campo contém o keyword."""
+    input_file, lo, hi, field_name, keyword_lc = task
+    # bytes.lower() só converte ASCII e o JSON pode trazer não-ASCII escapado (\u00c9):
+    # o pré-filtro só é seguro para keywords ASCII
+    keyword_variants = _keyword_variants(keyword_lc) if keyword_lc.isascii() else None
+
+    matches = []
+    with open(input_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for line in mm[lo:hi].splitlines():
+            # Pré-filtro barato: a maioria das linhas é descartada sem parse
+            if keyword_variants is not None:
+                line_lc = line.lower()
+                if not any(variant in line_lc for variant in keyword_variants):
+                    continue
+            data = orjson.loads(line)
+            if keyword_lc in data.get(field_name, "").lower():
+                matches.append(data)
+    return matches
+
+
+def extract_repositories(input_files, output_file, field_name, keyword, workers=None, chunk_size=CHUNK_SIZE):
+    keyword_lc = keyword.lower()
+    tasks = [
+        (input_file, lo, hi, field_name, keyword_lc)
+        for input_file in input_files
+        for lo, hi in _chunk_boundaries(input_file, chunk_size)
+    ]
 
-def extract_repositories(input_files, output_file, field_name, keyword):
     record_id = 1
-    with open(output_file, 'w', encoding='utf-8') as outfile:
-        for input_file in input_files:
-            with open(input_file, 'r', encoding='utf-8') as infile:
-                for line in infile:
-                    data = json.loads(line)
-                    if keyword.lower() in data.get(field_name, "").lower():
-                        data['id'] = record_id
-                        record_id += 1
-                        json.dump(data, outfile)
-                        outfile.write('\n')
-
-
-input_files = [
-    'data/dataset_chat_merge/dataset_val_conflict.jsonl'
-]
-extract_repositories(input_files, 'data/filtered_repositories.jsonl', 'repository_name', 'eclipse/')
+    with open(output_file, 'wb', buffering=1 << 20) as outfile, Pool(workers) as pool:
+        # imap preserva a ordem dos intervalos, então os IDs seguem a ordem dos arquivos
+        for matches in pool.imap(_filter_chunk, tasks):
+            for data in matches:
+                data['id'] = record_id
+                record_id += 1
+                outfile.write(orjson.dumps(data))
+                outfile.write(b'\n')
+
+
+if __name__ == "__main__":
+    input_files = [
+        'data/dataset_chat_merge/dataset_val_conflict.jsonl'
+    ]
+    extract_repositories(input_files, 'data/filtered_repositories.jsonl', 'repository_name', 'eclipse/')
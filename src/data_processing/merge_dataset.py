@@ -1,7 +1,9 @@
 from datetime import datetime
+from itertools import chain
+from pathlib import Path
 
 import argparse
-import json
+import orjson
 import os
 
 
@@ -14,15 +16,12 @@ def merge_datasets(dataset1_path, dataset2_path, output_path):
     """
     # Load datasets
     try:
-        with open(dataset1_path, 'r', encoding='utf-8') as f:
-            data1 = json.load(f)
-        
-        with open(dataset2_path, 'r', encoding='utf-8') as f:
-            data2 = json.load(f)
+        data1 = orjson.loads(Path(dataset1_path).read_bytes())
+        data2 = orjson.loads(Path(dataset2_path).read_bytes())
     except FileNotFoundError as e:
         print(f"Error: {e}")
         return
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print(f"Error: Invalid JSON format in one of the input files")
         return
     
@@ -39,31 +38,36 @@ def merge_datasets(dataset1_path, dataset2_path, output_path):
     first_dataset = data1 if min_id1 <= min_id2 else data2
     second_dataset = data2 if min_id1 <= min_id2 else data1
     
-    merged_data = {
-        "metadata": {
-            "provider": first_dataset["metadata"]["provider"],
-            "model": first_dataset["metadata"]["model"],
-            "timestamp": datetime.now().isoformat(),
-            "total_records": len(first_dataset["results"]) + len(second_dataset["results"]),
-            "is_checkpoint": False
-        },
-        "results": first_dataset["results"] + second_dataset["results"]
+    metadata = {
+        "provider": first_dataset["metadata"]["provider"],
+        "model": first_dataset["metadata"]["model"],
+        "timestamp": datetime.now().isoformat(),
+        "total_records": len(first_dataset["results"]) + len(second_dataset["results"]),
+        "is_checkpoint": False
     }
     
     # Keep additional metadata fields if they exist
     if "last_processed_index" in first_dataset["metadata"]:
-        merged_data["metadata"]["last_processed_index"] = max(
+        metadata["last_processed_index"] = max(
             first_dataset["metadata"].get("last_processed_index", 0),
             second_dataset["metadata"].get("last_processed_index", 0)
         )
     
-    # Save merged dataset
+    # Save merged dataset, writing the results of both datasets one by one
+    # instead of building a concatenated list
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(merged_data, f, indent=2, ensure_ascii=False)
+    with open(output_path, 'wb') as f:
+        f.write(b'{"metadata": ')
+        f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+        f.write(b',\n"results": [\n')
+        for i, result in enumerate(chain(first_dataset["results"], second_dataset["results"])):
+            if i:
+                f.write(b',\n')
+            f.write(orjson.dumps(result))
+        f.write(b'\n]}\n')
     
     print(f"Merged dataset saved to {output_path}")
-    print(f"Total records: {merged_data['metadata']['total_records']}")
+    print(f"Total records: {metadata['total_records']}")
 
 
 if __name__ == "__main__":
@@ -4,12 +4,16 @@ from ..llm.llm_config import (
     get_default_config
 )
 
+from functools import lru_cache
+
 import argparse
 
 
+@lru_cache(maxsize=None)
 def setup_cli_parser() -> argparse.ArgumentParser:
     """
     Set up the command line argument parser.
+    The parser is built once and reused on later calls.
     
     Returns:
         argparse.ArgumentParser: Configured argument parser
@@ -1,64 +1,139 @@
-from .utils import add_row_to_dataframe, handle_error, logger
-from .prompt import create_prompt
-from typing import Tuple
+from .utils import handle_error, logger
+from .llm.rate_limiter import AsyncRateLimiter, call_with_limits
+from .prompt import BATCH_SYSTEM_PROMPT, check_conflict_tuple, create_batch_user_prompt, create_user_prompt, parse_batch_response, system_prompt
+from typing import TYPE_CHECKING, Tuple
 
-import pandas as pd
-import time
+import asyncio
+import orjson
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-def process_dataframe(df, generate_content_fn, start_index=0, max_requests=None, wait_time=20) -> Tuple[pd.DataFrame, int]:
+
+async def process_dataframe(df, generate_content_fn, start_index=0, max_requests=None,
+                            requests_per_minute=15, max_concurrent=5, batch_size=1,
+                            output_fh=None, limiter=None) -> Tuple["pd.DataFrame", int]:
     """
     Generates conflict resolutions for a DataFrame of conflict information.
 
+    Requests are sent concurrently, bounded by a token-bucket rate limiter.
+    Rate limit and timeout errors are retried with exponential backoff.
+    With batch_size > 1, each request packs several conflicts into one prompt
+    (see create_batch_user_prompt), which reduces the number of requests per minute.
+    The instructions go as a separate system instruction, so every request
+    shares the same prefix and providers can cache it.
+
     Args:
         df: DataFrame with columns 'commit_sha', 'conflict_tuple', 'commit_message'
-        generate_content_fn: Function to generate resolution content from a prompt
+        generate_content_fn: Async function to generate resolution content from a prompt,
+            called as generate_content_fn(prompt, system_instruction=...)
         start_index: Starting index for processing (default: 0)
         max_requests: Max number of rows to process (default: all remaining)
-        wait_time: Seconds to wait between requests (default: 20)
+        requests_per_minute: Provider rate limit (default: 15)
+        max_concurrent: Max number of requests in flight (default: 5)
+        batch_size: Number of conflicts sent per request (default: 1)
+        output_fh: Binary file where each record is appended as a JSON line as soon
+            as it is available (default: None)
+        limiter: AsyncRateLimiter shared across calls, so consecutive calls keep the
+            pace of the previous ones (default: a new one from requests_per_minute
+            and max_concurrent)
 
     Returns:
         (DataFrame with resolutions, ending index)
     """
-    res_df = pd.DataFrame(columns=['id', 'commit_sha', 'conflict_resolution'])
     total_rows = len(df)
-    
+
     if max_requests is None:
         max_requests = total_rows - start_index
-    
+
     end_index = min(start_index + max_requests, total_rows)
-    
-    for index in range(start_index, end_index):
-        row = df.iloc[index]
-        
-        logger.section(f"LINHA {index + 1}/{end_index}")
-        logger.info(f"Commit SHA: {row['commit_sha']}")
-        
-        if 'commit_message' in row and row['commit_message']:
-            commit_msg = row['commit_message']
-            if len(commit_msg) > 80:
-                commit_msg = commit_msg[:77] + "..."
-            logger.info(f"Mensagem: {commit_msg}")
-        
-        try:
-            prompt = create_prompt(row['conflict_tuple'], row['commit_message'])
-            
-            logger.info(f"Processando...")
-            start_time = time.time()
-            response_text = generate_content_fn(prompt)
-            elapsed_time = time.time() - start_time
-            
-            logger.success(f"Resolvido em {elapsed_time:.2f}s")
-            
-            res_df = add_row_to_dataframe(res_df, row['commit_sha'], response_text, row['id'])
-            
-        except Exception as e:
-            logger.error(f"Erro no processamento")
-            res_df = handle_error(res_df, row, e)
-        
-        if index < end_index - 1:
-            logger.info(f"Aguardando próxima linha...")
-            time.sleep(wait_time)
-    
-    return res_df, end_index
 
+    # Slice the underlying column arrays directly: no per-row Series and no
+    # copy of the remaining rows of the DataFrame
+    ids = df['id'].to_numpy()[start_index:end_index].tolist()
+    shas = df['commit_sha'].to_numpy(object)[start_index:end_index]
+    tuples = df['conflict_tuple'].to_numpy(object)[start_index:end_index]
+    msgs = df['commit_message'].to_numpy(object)[start_index:end_index]
+    rows = list(zip(ids, shas, tuples, msgs))
+
+    if limiter is None:
+        limiter = AsyncRateLimiter(requests_per_minute, max_concurrent)
+
+    def write_record(record):
+        if output_fh is not None:
+            output_fh.write(orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY))
+            output_fh.write(b'\n')
+            output_fh.flush()
+
+    async def request(prompt, system_instruction, label):
+        def on_attempt(attempt_number):
+            if attempt_number > 1:
+                logger.warning("Nova tentativa (%d) para %s", attempt_number, label)
+            logger.info("Processando %s...", label)
+
+        response_text, elapsed_time = await call_with_limits(
+            limiter, generate_content_fn, prompt, system_instruction=system_instruction, on_attempt=on_attempt
+        )
+        logger.success("Resolvido (%s) em %.2fs", label, elapsed_time)
+        return response_text
+
+    async def worker(index):
+        id, commit_sha, conflict_tuple, commit_message = rows[index - start_index]
+        prompt = create_user_prompt(conflict_tuple, commit_message)
+        response_text = await request(prompt, system_prompt, f"linha {index + 1}/{end_index} (commit {commit_sha})")
+        write_record({'id': id, 'commit_sha': commit_sha, 'conflict_resolution': response_text, 'status': 'ok'})
+        return [response_text]
+
+    async def batch_worker(batch_start):
+        offset = batch_start - start_index
+        batch = rows[offset:offset + batch_size]
+
+        # A row with an invalid conflict gets its own error; the other rows are still sent
+        outcomes = [None] * len(batch)
+        valid = []
+        for i, (_, _, conflict_tuple, _) in enumerate(batch):
+            try:
+                check_conflict_tuple(conflict_tuple)
+                valid.append(i)
+            except ValueError as e:
+                outcomes[i] = e
+        if not valid:
+            return outcomes
+
+        prompt = create_batch_user_prompt((batch[i][2], batch[i][3]) for i in valid)
+        response_text = await request(prompt, BATCH_SYSTEM_PROMPT, f"lote {batch_start + 1}-{batch_start + len(batch)}/{end_index}")
+
+        resolutions = parse_batch_response(response_text)
+        for n, i in enumerate(valid, start=1):
+            id, commit_sha, _, _ = batch[i]
+            if n in resolutions:
+                outcomes[i] = resolutions[n]
+                write_record({'id': id, 'commit_sha': commit_sha, 'conflict_resolution': resolutions[n], 'status': 'ok'})
+            else:
+                outcomes[i] = ValueError(f"Resposta sem resolução para o conflito {n} do lote")
+        return outcomes
+
+    if batch_size > 1:
+        tasks = [batch_worker(i) for i in range(start_index, end_index, batch_size)]
+        sizes = [min(batch_size, end_index - i) for i in range(start_index, end_index, batch_size)]
+    else:
+        tasks = [worker(i) for i in range(start_index, end_index)]
+        sizes = [1] * len(tasks)
+
+    results = []
+    for size, outcome in zip(sizes, await asyncio.gather(*tasks, return_exceptions=True)):
+        results.extend([outcome] * size if isinstance(outcome, Exception) else outcome)
+
+    records: list[dict] = []
+    for index, (id, commit_sha, _, _), result in zip(range(start_index, end_index), rows, results):
+        if isinstance(result, Exception):
+            logger.error("Erro no processamento da linha %d: %s", index + 1, result)
+            records.append(handle_error(commit_sha, result, id))
+            write_record(records[-1])
+        else:
+            records.append({'id': id, 'commit_sha': commit_sha, 'conflict_resolution': result, 'status': 'ok'})
+
+    import pandas as pd
+
+    res_df = pd.DataFrame.from_records(records, columns=['id', 'commit_sha', 'conflict_resolution', 'status'])
+    return res_df, end_index
@@ -1,9 +1,9 @@
-from difflib import SequenceMatcher
+from concurrent.futures import ProcessPoolExecutor
+from rapidfuzz.process import cdist
+from rapidfuzz import fuzz
 from pathlib import Path
 
-import pandas as pd
-import numpy as np
-import json
+import orjson
 import re
 
 DATASET_PATH = 'data/elastic_train_conflicts.jsonl'
@@ -11,51 +11,64 @@ RESOLUTION_PATH = 'data/output/2-elastic-gemini_20250311/all_solved_conflicts_ge
 OUTPUT_DIR = Path('data/evaluation')
 
 SIMILARITY_THRESHOLD = 90 # Threshold percentage for considering approaches the same
+# Set to SIMILARITY_THRESHOLD to skip the exact a/b/base scores that cannot reach it
+# (they are reported as 0). Off by default, since the analysis notebook uses them.
+APPROACH_SCORE_CUTOFF = None
 
 EVALUATION_FILENAME_FORMAT = "{repo_name}-{model_name}-evaluation.json"
 SUMMARY_FILENAME_FORMAT = "{repo_name}-{model_name}-summary.json"
 
+# Code block markers (```java, ```, etc.) or whitespace at the end of a line
+_NORMALIZE_RE = re.compile(r'(?:```\w*\n?|\n?```)|[ \t]+$', flags=re.MULTILINE)
+
+APPROACHES = ("chose_a", "chose_b", "chose_base")
+
+NORMALIZED_FIELDS = ('original_resolution', 'a_content', 'b_content', 'base_content')
+
 def normalize_code(code):
     """
     Normalize code by removing code block markers, extra whitespace,
     and standardizing line endings.
     """
-    # Remove code block markers (```java, ```, etc.)
-    code = re.sub(r'```\w*\n?|\n?```', '', code)
-    
-    # Normalize whitespace (trim leading/trailing, standardize line endings)
-    code = code.strip()
+    if not code:
+        return ""
     
-    # Remove extra whitespace at end of lines
-    code = re.sub(r' +$', '', code, flags=re.MULTILINE)
-    
-    return code
+    # Single pass for markers and trailing whitespace, then trim the ends
+    return _NORMALIZE_RE.sub('', code).strip()
 
-def calculate_similarity(text1, text2):
+def calculate_similarity(text1, text2, cutoff=None):
     """
-    Calculate similarity between two text strings using SequenceMatcher.
-    Returns a score between 0 and 100.
+    Calculate similarity between two text strings using RapidFuzz.
+    Both texts are expected to be already normalized with normalize_code.
+    Returns a score between 0 and 100, or 0 when a cutoff is given and the
+    score is below it (RapidFuzz then rejects pairs early by their lengths).
     """
     if not text1 and not text2:
         return 100  # Both empty means they're identical
     if not text1 or not text2:
         return 0    # One empty means no similarity
     
-    text1 = normalize_code(text1)
-    text2 = normalize_code(text2)
-    
-    similarity = SequenceMatcher(None, text1, text2).ratio() * 100
+    return fuzz.ratio(text1, text2, score_cutoff=cutoff)
+
+def calculate_similarities(text, candidates, cutoff=None):
+    """
+    Calculate the similarity between a text and each candidate in a single
+    batched RapidFuzz call. Same scores as calculate_similarity.
+    """
+    import numpy as np
     
-    return similarity
+    # Worker processes already run in parallel, so cdist stays single-threaded
+    return cdist([text], candidates, scorer=fuzz.ratio, score_cutoff=cutoff,
+                 dtype=np.float64, workers=1)[0].tolist()
 
 def load_original_conflicts():
     """
     Load the original conflicts from the dataset file.
     """
     conflicts = {}
-    with open(DATASET_PATH, 'r') as f:
+    with open(DATASET_PATH, 'rb') as f:
         for line in f:
-            data = json.loads(line)
+            data = orjson.loads(line)
             conflicts[data['id']] = {
                 'original_resolution': data['conflict_tuple']['resolution'],
                 'a_content': data['conflict_tuple']['a_content'],
@@ -70,8 +83,7 @@ def load_generated_resolutions():
     """
     Load the generated resolutions from the results file.
     """
-    with open(RESOLUTION_PATH, 'r') as f:
-        data = json.load(f)
+    data = orjson.loads(Path(RESOLUTION_PATH).read_bytes())
     
     results = data['results']
     
@@ -84,80 +96,86 @@ def load_generated_resolutions():
     
     return resolutions
 
+def _score_one(args):
+    """
+    Evaluate a single conflict. Receives a (conflict_id, original, generated)
+    tuple so it can be dispatched to worker processes.
+    The resolution approach is classified afterwards by classify_approaches.
+    """
+    conflict_id, original, generated = args
+    
+    # Normalize each text once and reuse it in every comparison
+    normalized = {field: normalize_code(original[field]) for field in NORMALIZED_FIELDS}
+    original_norm = normalized['original_resolution']
+    generated_norm = normalize_code(generated['generated_resolution'])
+    a_norm = normalized['a_content']
+    b_norm = normalized['b_content']
+    base_norm = normalized['base_content']
+    
+    is_empty_resolution = original_norm == ""
+    
+    exact_match = original_norm == generated_norm
+    similarity = calculate_similarity(original_norm, generated_norm)
+    
+    a_similarity, b_similarity, base_similarity = calculate_similarities(
+        generated_norm, [a_norm, b_norm, base_norm], cutoff=APPROACH_SCORE_CUTOFF
+    )
+    
+    return {
+        'id': conflict_id,
+        'exact_match': exact_match,
+        'similarity': similarity,
+        'is_empty_resolution': is_empty_resolution,
+        'a_similarity': a_similarity,
+        'b_similarity': b_similarity,
+        'base_similarity': base_similarity,
+        'filename': original['filename'],
+        'commit_sha': original['commit_sha']
+    }
+
+def classify_approaches(a_sim, b_sim, base_sim):
+    """
+    Simple heuristic to classify resolution approach, vectorized over all conflicts.
+    A resolution chose a side when its highest similarity is above the threshold;
+    ties favor a, then b, then base.
+    """
+    import numpy as np
+    
+    stacked = np.stack([a_sim, b_sim, base_sim])
+    highest = stacked.max(axis=0)
+    idx = stacked.argmax(axis=0)
+    return np.where(highest > SIMILARITY_THRESHOLD, np.array(APPROACHES)[idx], "custom")
+
 def evaluate_resolutions():
     """
     Compare original and generated resolutions and create evaluation metrics.
+    Conflicts are scored in parallel across worker processes.
     """
     original_conflicts = load_original_conflicts()
     generated_resolutions = load_generated_resolutions()
     
-    evaluation = []
-    
-    for conflict_id in original_conflicts:
-        if conflict_id in generated_resolutions:
-            original = original_conflicts[conflict_id]['original_resolution']
-            generated = generated_resolutions[conflict_id]['generated_resolution']
-            
-            original_norm = normalize_code(original)
-            generated_norm = normalize_code(generated)
-            
-            is_empty_resolution = original_norm == ""
-            
-            exact_match = original_norm == generated_norm
-            similarity = calculate_similarity(original, generated)
-            
-            a_content = original_conflicts[conflict_id]['a_content']
-            b_content = original_conflicts[conflict_id]['b_content']
-            base_content = original_conflicts[conflict_id]['base_content']
-            
-            a_similarity = calculate_similarity(generated, a_content)
-            b_similarity = calculate_similarity(generated, b_content)
-            base_similarity = calculate_similarity(generated, base_content)
-            
-            # Simple heuristic to classify resolution approach
-            approach = "custom"
-            highest_sim = max(a_similarity, b_similarity, base_similarity)
-            
-            if highest_sim > SIMILARITY_THRESHOLD:  # Threshold for considering it's the same
-                if highest_sim == a_similarity:
-                    approach = "chose_a"
-                elif highest_sim == b_similarity:
-                    approach = "chose_b"
-                elif highest_sim == base_similarity:
-                    approach = "chose_base"
-            
-            evaluation.append({
-                'id': conflict_id,
-                'exact_match': exact_match,
-                'similarity': similarity,
-                'is_empty_resolution': is_empty_resolution,
-                'resolution_approach': approach,
-                'a_similarity': a_similarity,
-                'b_similarity': b_similarity,
-                'base_similarity': base_similarity,
-                'filename': original_conflicts[conflict_id]['filename'],
-                'commit_sha': original_conflicts[conflict_id]['commit_sha']
-            })
+    # Only conflicts that have a generated resolution, in ID order
+    common_ids = sorted(original_conflicts.keys() & generated_resolutions.keys())
+    payloads = [
+        (conflict_id, original_conflicts[conflict_id], generated_resolutions[conflict_id])
+        for conflict_id in common_ids
+    ]
+    
+    with ProcessPoolExecutor() as executor:
+        evaluation = list(executor.map(_score_one, payloads, chunksize=64))
+    
+    import pandas as pd
     
     df = pd.DataFrame(evaluation)
+    if not df.empty:
+        approaches = classify_approaches(
+            df['a_similarity'].to_numpy(dtype=float),
+            df['b_similarity'].to_numpy(dtype=float),
+            df['base_similarity'].to_numpy(dtype=float)
+        )
+        df.insert(df.columns.get_loc('is_empty_resolution') + 1, 'resolution_approach', approaches)
     return df
 
-def json_serialize(obj):
-    """
-    Converte valores NumPy para tipos Python nativos para permitir serialização JSON.
-    """
-    if isinstance(obj, (np.integer, np.int64)):
-        return int(obj)
-    elif isinstance(obj, (np.floating, np.float64)):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, pd.DataFrame):
-        return obj.to_dict('records')
-    elif isinstance(obj, pd.Series):
-        return obj.to_dict()
-    return obj
-
 def save_evaluation_results(df):
     """
     Save evaluation results to JSON files.
@@ -169,22 +187,28 @@ def save_evaluation_results(df):
     
     OUTPUT_DIR.mkdir(exist_ok=True)
     
-    with open(RESOLUTION_PATH, 'r') as f:
-        resolution_data = json.load(f)
-        metadata = resolution_data.get('metadata', {})
-        model_name = metadata.get('model', 'unknown')
-        repo_name = metadata.get('repository_name', 'unknown')
+    resolution_data = orjson.loads(Path(RESOLUTION_PATH).read_bytes())
+    metadata = resolution_data.get('metadata', {})
+    model_name = metadata.get('model', 'unknown')
+    repo_name = metadata.get('repository_name', 'unknown')
     
     # Save main evaluation results
     results_filename = EVALUATION_FILENAME_FORMAT.format(
         repo_name=repo_name,
         model_name=model_name
     )
-    df.to_json(OUTPUT_DIR / results_filename, orient='records', indent=2)
+    (OUTPUT_DIR / results_filename).write_bytes(
+        orjson.dumps(df.to_dict('records'), option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2)
+    )
     
     # Save file extension summary
-    df['file_extension'] = df['filename'].apply(lambda x: x.split('.')[-1] if '.' in x else 'unknown')
-    ext_summary = df.groupby('file_extension').agg({
+    filenames = df['filename'].astype(str)
+    df['file_extension'] = (
+        filenames.str.rpartition('.')[2]
+        .where(filenames.str.contains('.', regex=False), 'unknown')
+        .astype('category')
+    )
+    ext_summary = df.groupby('file_extension', observed=True).agg({
         'exact_match': ['count', 'mean'],
         'similarity': 'mean'
     })
@@ -197,8 +221,9 @@ def save_evaluation_results(df):
         repo_name=repo_name,
         model_name=model_name
     )
-    with open(OUTPUT_DIR / ext_summary_filename, 'w') as f:
-        json.dump(ext_summary_json, f, indent=2, default=json_serialize)
+    (OUTPUT_DIR / ext_summary_filename).write_bytes(
+        orjson.dumps(ext_summary_json, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2)
+    )
     
     print(f"Results saved to '{OUTPUT_DIR / results_filename}' and '{OUTPUT_DIR / ext_summary_filename}'")
     
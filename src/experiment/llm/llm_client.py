@@ -1,17 +1,67 @@
-from litellm import completion
+from litellm import acompletion
 from .llm_config import LLMConfig
+from functools import lru_cache
+from typing import Optional
+
+import asyncio
+import httpx
+import orjson
+import weakref
+
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com"
+HTTP_TIMEOUT = 60
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128)
+BATCH_POLL_INTERVAL = 30
+BATCH_TIMEOUT = 24 * 60 * 60  # Target turnaround of the Batch API
+BATCH_DONE_STATES = ("BATCH_STATE_SUCCEEDED", "BATCH_STATE_FAILED", "BATCH_STATE_CANCELLED", "BATCH_STATE_EXPIRED")
+
+
+@lru_cache(maxsize=8)
+def _json_string(text: str) -> bytes:
+    # The system instruction is the same in every request: escape it only once
+    return orjson.dumps(text)
+
+
+def _gemini_request(prompt: str, system_instruction: Optional[str] = None) -> bytes:
+    """JSON body of a generateContent request, assembled from pre-encoded pieces."""
+    body = b'{"contents":[{"role":"user","parts":[{"text":' + orjson.dumps(prompt) + b'}]}]'
+    if system_instruction:
+        body += b',"systemInstruction":{"parts":[{"text":' + _json_string(system_instruction) + b'}]}'
+    return body + b'}'
+
+
+def _gemini_text(response: dict) -> str:
+    return response["candidates"][0]["content"]["parts"][0]["text"]
+
+
+def _build_messages(prompt: str, system_instruction: Optional[str] = None) -> list:
+    if system_instruction:
+        return [
+            {"role": "system", "content": system_instruction},
+            {"role": "user", "content": prompt}
+        ]
+    return [{"role": "user", "content": prompt}]
 
 
 class LLMClient:
     def __init__(self, config: LLMConfig):
         self.config = config
+        # One pooled HTTP/2 client per event loop, reused by every async call
+        self._http_clients = weakref.WeakKeyDictionary()
         
-    def generate_content(self, prompt: str) -> str:
+    async def generate_content_async(self, prompt: str, system_instruction: Optional[str] = None) -> str:
         """
-        Generate content using the configured LLM provider and model.
+        Generate content using the configured LLM provider and model. The call
+        is asynchronous, so several requests can be in flight at the same
+        time. Google models are called through the Gemini
+        REST API over a persistent HTTP/2 connection; other providers go
+        through LiteLLM.
         
         Args:
             prompt (str): The prompt to send to the LLM
+            system_instruction (str, optional): Instructions sent as a separate
+                system message. Keeping them identical across requests lets the
+                provider cache that prefix
             
         Returns:
             str: The generated response
@@ -21,9 +71,12 @@ class LLMClient:
             Exception: For other LLM-related errors
         """
         try:
-            response = completion(
+            if self.config.provider == "google":
+                return await self._generate_gemini_content(prompt, system_instruction)
+            
+            response = await acompletion(
                 model=self.config.get_model_string(),
-                messages=[{"role": "user", "content": prompt}],
+                messages=_build_messages(prompt, system_instruction),
                 api_key=self.config.api_key,
                 api_base=self.config.api_base,
                 verbose=False
@@ -32,6 +85,159 @@ class LLMClient:
             return response.choices[0].message.content
             
         except ValueError as e:
-            raise ValueError(f"Configuration error: {str(e)}")
+            raise ValueError(f"Configuration error: {str(e)}") from e
         except Exception as e:
-            raise Exception(f"Error generating content: {str(e)}")
+            raise Exception(f"Error generating content: {str(e)}") from e
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._http_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                http2=True,
+                base_url=GEMINI_API_BASE,
+                limits=HTTP_LIMITS,
+                timeout=HTTP_TIMEOUT
+            )
+            self._http_clients[loop] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client of the running event loop, if one was opened."""
+        client = self._http_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def _generate_gemini_content(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        if not self.config.api_key:
+            raise ValueError("No API key found for provider google")
+        
+        response = await self._get_http_client().post(
+            f"/v1beta/models/{self.config.model}:generateContent",
+            headers={"x-goog-api-key": self.config.api_key, "Content-Type": "application/json"},
+            content=_gemini_request(prompt, system_instruction)
+        )
+        response.raise_for_status()
+        
+        return _gemini_text(response.json())
+
+    async def generate_content_batch_async(self, requests: dict, poll_interval: float = BATCH_POLL_INTERVAL,
+                                           timeout: Optional[float] = BATCH_TIMEOUT) -> dict:
+        """
+        Generate content for many prompts through the Gemini Batch API. The
+        requests are uploaded as one JSONL file and processed offline (target
+        turnaround of 24h) at a lower cost and outside the per-minute limits,
+        so this is meant for non-interactive workloads.
+        
+        Args:
+            requests (dict): Key -> (prompt, system_instruction)
+            poll_interval (float): Seconds between batch status checks
+            timeout (float): Seconds to wait for the job before cancelling it (None waits forever)
+            
+        Returns:
+            dict: Key -> generated response, only for the requests that succeeded
+            
+        Raises:
+            ValueError: If the provider does not support batch requests
+            TimeoutError: If the batch job does not finish within `timeout`; the job is cancelled
+            Exception: If the batch job does not finish successfully
+        """
+        if self.config.provider != "google":
+            raise ValueError(f"Batch API not supported for provider {self.config.provider}")
+        if not self.config.api_key:
+            raise ValueError("No API key found for provider google")
+        
+        client = self._get_http_client()
+        headers = {"x-goog-api-key": self.config.api_key}
+        
+        lines = b"\n".join(
+            b'{"key":' + orjson.dumps(str(key)) + b',"request":' + _gemini_request(prompt, system_instruction) + b'}'
+            for key, (prompt, system_instruction) in requests.items()
+        )
+        
+        # Resumable upload of the JSONL file: start the session, then send the content
+        response = await client.post(
+            "/upload/v1beta/files",
+            headers={
+                **headers,
+                "X-Goog-Upload-Protocol": "resumable",
+                "X-Goog-Upload-Command": "start",
+                "X-Goog-Upload-Header-Content-Length": str(len(lines)),
+                "X-Goog-Upload-Header-Content-Type": "application/jsonl"
+            },
+            json={"file": {"display_name": "regenerate-conflicts"}}
+        )
+        response.raise_for_status()
+        response = await client.post(
+            response.headers["x-goog-upload-url"],
+            headers={
+                **headers,
+                "X-Goog-Upload-Offset": "0",
+                "X-Goog-Upload-Command": "upload, finalize"
+            },
+            content=lines
+        )
+        response.raise_for_status()
+        input_file = response.json()["file"]["name"]
+        
+        response = await client.post(
+            f"/v1beta/models/{self.config.model}:batchGenerateContent",
+            headers=headers,
+            json={"batch": {"display_name": "regenerate-conflicts", "input_config": {"file_name": input_file}}}
+        )
+        response.raise_for_status()
+        batch_name = response.json()["name"]
+        
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        try:
+            while True:
+                response = await client.get(f"/v1beta/{batch_name}", headers=headers)
+                response.raise_for_status()
+                batch = response.json()
+                state = batch.get("metadata", {}).get("state")
+                if state in BATCH_DONE_STATES:
+                    break
+                if deadline is None:
+                    await asyncio.sleep(poll_interval)
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"Batch {batch_name} did not finish within {timeout}s")
+                await asyncio.sleep(min(poll_interval, remaining))
+        except (TimeoutError, asyncio.CancelledError):
+            # Don't leave the job running (and billed) once nobody waits for it
+            await self._cancel_batch(batch_name)
+            raise
+        
+        if state != "BATCH_STATE_SUCCEEDED":
+            raise Exception(f"Batch {batch_name} finished with state {state}")
+        
+        response = await client.get(
+            f"/download/v1beta/{batch['response']['responsesFile']}:download",
+            headers=headers,
+            params={"alt": "media"}
+        )
+        response.raise_for_status()
+        
+        results = {}
+        for line in response.content.splitlines():
+            if not line.strip():
+                continue
+            record = orjson.loads(line)
+            if "response" in record:
+                try:
+                    results[record["key"]] = _gemini_text(record["response"])
+                except (KeyError, IndexError):
+                    pass
+        return results
+
+    async def _cancel_batch(self, batch_name: str) -> None:
+        """Best-effort cancellation of a batch job."""
+        try:
+            response = await self._get_http_client().post(
+                f"/v1beta/{batch_name}:cancel", headers={"x-goog-api-key": self.config.api_key}
+            )
+            response.raise_for_status()
+        except httpx.HTTPError:
+            pass
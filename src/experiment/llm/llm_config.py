@@ -1,12 +1,14 @@
 from dataclasses import dataclass
 from dotenv import load_dotenv
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Optional
 
 import os
 
 load_dotenv()
 
-PROVIDER_CONFIGS = {
+_PROVIDER_CONFIGS = {
     "google": {
         "model_prefix": "gemini",
         "api_key_env": "GOOGLE_API_KEY",
@@ -24,8 +26,20 @@ PROVIDER_CONFIGS = {
     }
 }
 
+# Read-only view, since configurations are cached below
+PROVIDER_CONFIGS = MappingProxyType({
+    provider: MappingProxyType(config) for provider, config in _PROVIDER_CONFIGS.items()
+})
 
-@dataclass
+# Snapshot of the environment variables used here, taken after loading .env
+ENVIRONMENT = MappingProxyType({
+    name: os.getenv(name)
+    for name in [config["api_key_env"] for config in PROVIDER_CONFIGS.values()]
+    + ["DEFAULT_LLM_PROVIDER", "DEFAULT_LLM_MODEL"]
+})
+
+
+@dataclass(frozen=True)
 class LLMConfig:
     provider: str
     model: str
@@ -42,6 +56,7 @@ class LLMConfig:
         return f"{model_prefix}/{self.model}"
 
 
+@lru_cache(maxsize=None)
 def create_config(provider: str, model: str) -> LLMConfig:
     """
     Create a configuration for a specific provider and model.
@@ -60,7 +75,7 @@ def create_config(provider: str, model: str) -> LLMConfig:
     if not provider_config:
         raise ValueError(f"Unsupported provider: {provider}")
     
-    api_key = os.getenv(provider_config["api_key_env"])
+    api_key = ENVIRONMENT.get(provider_config["api_key_env"])
     if not api_key:
         raise ValueError(f"No API key found for provider {provider}")
     
@@ -72,9 +87,10 @@ def create_config(provider: str, model: str) -> LLMConfig:
     )
 
 
+@lru_cache(maxsize=None)
 def get_default_config() -> LLMConfig:
     """Returns a configuration based on environment variables"""
-    provider = os.getenv("DEFAULT_LLM_PROVIDER", "google")
-    model = os.getenv("DEFAULT_LLM_MODEL", "gemini-2.0-flash")
+    provider = ENVIRONMENT.get("DEFAULT_LLM_PROVIDER") or "google"
+    model = ENVIRONMENT.get("DEFAULT_LLM_MODEL") or "gemini-2.0-flash"
     
     return create_config(provider, model) 
\ No newline at end of file
@@ -0,0 +1,193 @@
+from litellm import RateLimitError, Timeout
+from typing import Awaitable, Callable, Optional, Tuple, TypeVar
+
+import asyncio
+import httpx
+import tenacity
+import time
+
+RETRYABLE_ERRORS = (RateLimitError, Timeout, TimeoutError, httpx.TimeoutException)
+RETRYABLE_STATUS_CODES = (429, 503)
+MAX_ATTEMPTS = 6
+
+T = TypeVar("T")
+
+
+class AsyncRateLimiter:
+    """
+    Token-bucket rate limiter combined with a concurrency cap.
+
+    Tokens refill continuously at `requests_per_minute / 60` per second, and at
+    most `max_concurrent` requests are in flight at any time. Use it as an async
+    context manager around each LLM call:
+
+        async with limiter:
+            response = await generate_content_fn(prompt)
+    """
+
+    def __init__(self, requests_per_minute: int, max_concurrent: int = 10):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        if max_concurrent <= 0:
+            raise ValueError("max_concurrent must be positive")
+
+        self.requests_per_minute = requests_per_minute
+        self.max_concurrent = max_concurrent
+        self._rate = requests_per_minute / 60.0
+        self._capacity = float(max_concurrent)
+        self._tokens = self._capacity
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+        self._last_refill = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available (and any back-off has expired)."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    def pause(self, seconds: float) -> None:
+        """Block new requests for `seconds`, e.g. after a 429 with Retry-After."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers) -> None:
+        """
+        Adjust the limiter using the provider's rate limit headers.
+
+        `Retry-After` pauses the limiter for the given number of seconds, and an
+        exhausted `X-RateLimit-Remaining` drains the bucket so the next request
+        waits for a refill.
+        """
+        if not headers:
+            return
+
+        retry_after = _parse_retry_after(headers)
+        if retry_after is not None:
+            self.pause(retry_after)
+
+        remaining = headers.get("x-ratelimit-remaining") or headers.get("X-RateLimit-Remaining")
+        if remaining is not None and str(remaining).strip() == "0":
+            self._tokens = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            await self.acquire()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
+
+
+def get_error_headers(error: BaseException) -> Optional[dict]:
+    """
+    Extract HTTP response headers from an exception raised by an LLM call.
+    Follows the exception chain, since `LLMClient` wraps provider errors.
+    """
+    while error is not None:
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if headers:
+            return headers
+        error = error.__cause__
+    return None
+
+
+def _parse_retry_after(headers) -> Optional[float]:
+    if not headers:
+        return None
+    retry_after = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(retry_after) if retry_after is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """Return the Retry-After value (in seconds) sent with a failed call, if any."""
+    return _parse_retry_after(get_error_headers(error))
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """True for rate limit and timeout errors, anywhere in the exception chain."""
+    while error is not None:
+        if isinstance(error, RETRYABLE_ERRORS):
+            return True
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code in RETRYABLE_STATUS_CODES:
+            return True
+        error = error.__cause__
+    return False
+
+
+_backoff = tenacity.wait_random_exponential(min=1, max=60)
+
+
+def _wait_retry_after_or_backoff(retry_state) -> float:
+    retry_after = get_retry_after(retry_state.outcome.exception())
+    return retry_after if retry_after is not None else _backoff(retry_state)
+
+
+def retrying(max_attempts: int = MAX_ATTEMPTS) -> tenacity.AsyncRetrying:
+    """
+    Retry policy for LLM calls: only rate limit and timeout errors are retried,
+    waiting for Retry-After when the provider sends it and using exponential
+    backoff with jitter otherwise.
+
+        async for attempt in retrying():
+            with attempt:
+                async with limiter:
+                    response = await generate_content_fn(prompt)
+    """
+    return tenacity.AsyncRetrying(
+        wait=_wait_retry_after_or_backoff,
+        stop=tenacity.stop_after_attempt(max_attempts),
+        retry=tenacity.retry_if_exception(is_retryable_error),
+        reraise=True
+    )
+
+
+async def call_with_limits(limiter: AsyncRateLimiter, fn: Callable[..., Awaitable[T]], *args,
+                           on_attempt: Optional[Callable[[int], None]] = None, **kwargs) -> Tuple[T, float]:
+    """
+    Await `fn(*args, **kwargs)` inside `limiter`, retried with the `retrying()`
+    policy. Rate limit headers sent with a failed call are fed back to the
+    limiter before the error is retried or raised.
+
+    `on_attempt`, if given, is called with the attempt number once the limiter
+    lets the attempt through, right before the call.
+
+    Returns:
+        (result, seconds taken by the successful attempt)
+    """
+    async for attempt in retrying():
+        with attempt:
+            async with limiter:
+                if on_attempt is not None:
+                    on_attempt(attempt.retry_state.attempt_number)
+                start_time = time.monotonic()
+                try:
+                    result = await fn(*args, **kwargs)
+                except Exception as e:
+                    limiter.update_from_headers(get_error_headers(e))
+                    raise
+    return result, time.monotonic() - start_time
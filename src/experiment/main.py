@@ -1,14 +1,20 @@
 from .conflict_resolution_generator import process_dataframe
 from .config.cli_config import setup_cli_parser, get_llm_config_from_args
 from .llm.llm_client import LLMClient
-from .utils import get_project_root, logger
+from .llm.rate_limiter import AsyncRateLimiter, call_with_limits
+from .prompt import create_user_prompt, system_prompt
+from .utils import get_project_root, logger, read_jsonl
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from glob import glob
 
-import pandas as pd
 import argparse
+import asyncio
 import logging
 import json
+import orjson
+import re
 import time
 import os
 
@@ -21,10 +27,18 @@ EXPERIMENT_NROWS = 2245
 EXPERIMENT_START_INDEX = 1300
 EXPERIMENT_MAX_REQUESTS = 1500
 EXPERIMENT_CHECKPOINT_INTERVAL = 50
-EXPERIMENT_WAIT_TIME = 30
+EXPERIMENT_REQUESTS_PER_MINUTE = 15
+EXPERIMENT_MAX_CONCURRENT = 5
+EXPERIMENT_BATCH_SIZE = 1  # Conflitos por requisição (4, 8 ou 16 reduzem o número de requisições)
 
 REPOSITORY_NAME = "elastic"
 
+# Colunas do dataset usadas na geração (as demais não são carregadas)
+INPUT_COLUMNS = ['id', 'commit_sha', 'conflict_tuple', 'commit_message']
+
+# Mensagens que indicam que a resolução falhou por erro na API do LLM
+FAILED_RESOLUTION_RE = re.compile(r"^Erro ao gerar|Error generating content|RateLimitError|rate_limit_exceeded")
+
 def setup_llm():
     """
     Configura e inicializa o cliente LLM com base nos argumentos da linha de comando.
@@ -60,7 +74,7 @@ def load_input_data(project_root, nrows=1):
     input_path = os.path.join(project_root, INPUT_DATA_DIR, INPUT_DATA_FILE)
     
     start_time = time.time()
-    df = pd.read_json(open(input_path, 'r'), lines=True, nrows=nrows)
+    df = read_jsonl(input_path, nrows=nrows, columns=INPUT_COLUMNS)
     elapsed_time = time.time() - start_time
     
     logger.success(f"Carregados {len(df)} registros em {elapsed_time:.2f}s")
@@ -68,48 +82,107 @@ def load_input_data(project_root, nrows=1):
     return df
 
 
-def save_checkpoint(result_df, llm_config, project_root, last_processed_index, is_final=False):
+def get_output_path(project_root, llm_config, prefix, timestamp, ext):
     """
-    Salva um checkpoint dos resultados em um arquivo JSON com metadados.
+    Monta o caminho de um arquivo de saída no formato
+    `{prefix}_{modelo}_{timestamp}{ext}`, criando o diretório de saída se necessário.
     
     Args:
-        result_df (pandas.DataFrame): DataFrame com os resultados
-        llm_config (LLMConfig): Configuração do LLM
         project_root (str): Caminho raiz do projeto
-        last_processed_index (int): Índice do último item processado
-        is_final (bool): Indica se é o salvamento final ou um checkpoint intermediário
+        llm_config (LLMConfig): Configuração do LLM
+        prefix (str): Prefixo do nome do arquivo
+        timestamp (str): Timestamp já formatado
+        ext (str): Extensão do arquivo
+        
+    Returns:
+        str: Caminho do arquivo de saída
     """
-    logger.section("Salvando " + ("resultados finais" if is_final else "checkpoint"))
-    
     output_dir = os.path.join(project_root, OUTPUT_DIR)
     os.makedirs(output_dir, exist_ok=True)
     
     model_name = llm_config.model.split('/')[-1].lower()
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(output_dir, f"{prefix}_{model_name}_{timestamp}{ext}")
+
+
+def save_checkpoint(results_file, llm_config, last_processed_index, total_records):
+    """
+    Salva um checkpoint do processamento. Os resultados já estão no arquivo
+    NDJSON gravado durante o processamento, então o checkpoint garante que ele
+    está no disco (fsync) e atualiza o arquivo de metadados ao lado dele
+    (sobrescrito a cada lote).
     
-    if is_final:
-        filename = f"solved_conflicts_{model_name}_{timestamp}.json"
-    else:
-        filename = f"checkpoint_{model_name}_{timestamp}_idx{last_processed_index}.json"
+    Args:
+        results_file (file): Arquivo NDJSON aberto com os resultados
+        llm_config (LLMConfig): Configuração do LLM
+        last_processed_index (int): Índice do último item processado
+        total_records (int): Número de resultados gravados até agora
+    """
+    results_path = results_file.name
+    metadata_path = os.path.splitext(results_path)[0] + ".meta.json"
+    
+    metadata = {
+        "provider": llm_config.provider,
+        "model": llm_config.model,
+        "repository_name": REPOSITORY_NAME,
+        "timestamp": datetime.now().isoformat(),
+        "total_records": total_records,
+        "last_processed_index": last_processed_index,
+        "is_checkpoint": True,
+        "results_file": os.path.basename(results_path)
+    }
     
-    output_path = os.path.join(output_dir, filename)
+    try:
+        os.fsync(results_file.fileno())
+        
+        tmp_path = metadata_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(metadata))
+        os.replace(tmp_path, metadata_path)
+        
+        return metadata_path
+    except Exception as e:
+        logger.error(f"Erro ao salvar checkpoint: {str(e)}")
+        return None
+
+
+def save_results(result_df, llm_config, project_root, last_processed_index=None):
+    """
+    Salva os resultados finais em um arquivo JSON com metadados.
     
-    output_data = {
-        "metadata": {
-            "provider": llm_config.provider,
-            "model": llm_config.model,
-            "repository_name": REPOSITORY_NAME,
-            "timestamp": datetime.now().isoformat(),
-            "total_records": len(result_df),
-            "last_processed_index": last_processed_index,
-            "is_checkpoint": not is_final
-        },
-        "results": json.loads(result_df.to_json(orient="records"))
+    Args:
+        result_df (pandas.DataFrame): DataFrame com os resultados
+        llm_config (LLMConfig): Configuração do LLM
+        project_root (str): Caminho raiz do projeto
+        last_processed_index (int, optional): Índice do último item processado
+    """
+    logger.section("Salvando resultados finais")
+    
+    now = datetime.now()
+    output_path = get_output_path(project_root, llm_config, "solved_conflicts", now.strftime("%Y%m%d_%H%M%S"), ".json")
+    
+    metadata = {
+        "provider": llm_config.provider,
+        "model": llm_config.model,
+        "repository_name": REPOSITORY_NAME,
+        "timestamp": now.isoformat(),
+        "total_records": len(result_df),
+        "last_processed_index": last_processed_index,
+        "is_checkpoint": False
     }
     
     try:
-        with open(output_path, 'w') as f:
-            json.dump(output_data, f, indent=2)
+        # Escreve registro a registro (um por linha), sem montar o objeto completo em memória
+        columns = list(result_df.columns)
+        column_values = [result_df[column].tolist() for column in columns]
+        
+        with open(output_path, 'wb', buffering=1 << 20) as f:
+            f.write(b'{"metadata":')
+            f.write(orjson.dumps(metadata))
+            f.write(b',"results":[')
+            for n, values in enumerate(zip(*column_values)):
+                f.write(b'\n' if n == 0 else b',\n')
+                f.write(orjson.dumps(dict(zip(columns, values)), option=orjson.OPT_SERIALIZE_NUMPY))
+            f.write(b'\n]}\n')
         
         logger.success(f"Resultados salvos em: {output_path}")
         return output_path
@@ -118,92 +191,132 @@ def save_checkpoint(result_df, llm_config, project_root, last_processed_index, i
         return None
 
 
-def save_results(result_df, llm_config, project_root, last_processed_index=None):
+def open_results_stream(llm_config, project_root):
     """
-    Salva os resultados finais em um arquivo JSON com metadados.
+    Abre o arquivo NDJSON onde cada resultado é gravado assim que é gerado,
+    para que nada se perca se o processamento for interrompido.
     
     Args:
-        result_df (pandas.DataFrame): DataFrame com os resultados
         llm_config (LLMConfig): Configuração do LLM
         project_root (str): Caminho raiz do projeto
-        last_processed_index (int, optional): Índice do último item processado
+        
+    Returns:
+        file: Arquivo aberto em modo binário
     """
-    return save_checkpoint(result_df, llm_config, project_root, last_processed_index, is_final=True)
+    # Microssegundos no nome: duas execuções no mesmo segundo não compartilham o arquivo
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    output_path = get_output_path(project_root, llm_config, "results", timestamp, ".jsonl")
+    
+    logger.info(f"Resultados parciais em: {output_path}")
+    return open(output_path, 'ab')
+
+
+def wait_checkpoint(pending_checkpoint):
+    """Aguarda um checkpoint salvo em segundo plano e registra o resultado."""
+    index, future = pending_checkpoint
+    checkpoint_path = future.result()
+    logger.info("Checkpoint salvo no índice %d: %s", index, checkpoint_path)
 
 
-def process_data(df, generate_content_fn, start_index=0, max_requests=1500, checkpoint_interval=50, project_root=None, llm_config=None):
+def process_data(df, llm_client, start_index=0, max_requests=1500, checkpoint_interval=50, project_root=None, llm_config=None,
+                 prompts_per_request=1):
     """
     Processa os dados usando a função de geração de conteúdo.
     
     Args:
         df (pandas.DataFrame): DataFrame com os dados de entrada
-        generate_content_fn (callable): Função para gerar conteúdo
+        llm_client (LLMClient): Cliente LLM (o pool HTTP dele é fechado ao final)
         start_index (int): Índice inicial para processamento
         max_requests (int): Número máximo de requisições
         checkpoint_interval (int): Intervalo de registros para salvar checkpoint
         project_root (str): Caminho raiz do projeto (necessário para salvar checkpoints)
         llm_config (LLMConfig): Configuração do LLM (necessário para salvar checkpoints)
+        prompts_per_request (int): Conflitos enviados em cada requisição ao LLM
         
     Returns:
         tuple: (result_df, last_processed_index) - DataFrame com resultados e último índice processado
     """
+    import pandas as pd
+    
     logger.section("Processando dados")
     
     total_rows = len(df)
     logger.info(f"Iniciando processamento de {min(max_requests, total_rows - start_index)} registros")
+    if prompts_per_request > 1:
+        logger.info(f"Enviando {prompts_per_request} conflitos por requisição")
     
     start_time = time.time()
     
     batch_size = min(checkpoint_interval, max_requests)
     
-    result_df = pd.DataFrame()
+    batch_frames = []
+    total_records = 0
     current_index = start_index
     
-    try:
-        while current_index < min(total_rows, start_index + max_requests):
-            end_index = min(current_index + batch_size, start_index + max_requests)
-            
-            logger.info(f"Processando lote de {current_index} até {end_index-1}")
-            
-            batch_df, last_idx = process_dataframe(
-                df, 
-                generate_content_fn, 
-                current_index, 
-                end_index - current_index,
-                wait_time=EXPERIMENT_WAIT_TIME
-            )
-            
-            current_index = end_index
-            
-            if not batch_df.empty:
-                if result_df.empty:
-                    result_df = batch_df
-                else:
-                    result_df = pd.concat([result_df, batch_df], ignore_index=True)
-            
-            if project_root and llm_config and not result_df.empty:
-                checkpoint_path = save_checkpoint(
-                    result_df, 
-                    llm_config, 
-                    project_root, 
-                    end_index,
-                    is_final=False
+    output_fh = open_results_stream(llm_config, project_root) if project_root and llm_config else None
+    checkpoint_executor = ThreadPoolExecutor(max_workers=1)
+    pending_checkpoint = None
+    
+    async def process_batches():
+        nonlocal current_index, total_records, pending_checkpoint
+        
+        # Todos os lotes no mesmo event loop, reaproveitando o pool HTTP do cliente,
+        # e no mesmo rate limiter: um lote novo não começa com o balde cheio
+        limiter = AsyncRateLimiter(EXPERIMENT_REQUESTS_PER_MINUTE, EXPERIMENT_MAX_CONCURRENT)
+        try:
+            while current_index < min(total_rows, start_index + max_requests):
+                end_index = min(current_index + batch_size, start_index + max_requests)
+                
+                logger.info("Processando lote de %d até %d", current_index, end_index - 1)
+                
+                batch_df, last_idx = await process_dataframe(
+                    df, 
+                    llm_client.generate_content_async, 
+                    current_index, 
+                    end_index - current_index,
+                    batch_size=prompts_per_request,
+                    output_fh=output_fh,
+                    limiter=limiter
                 )
-                logger.info(f"Checkpoint salvo no índice {end_index}: {checkpoint_path}")
                 
-                # Aguardar entre lotes para evitar atingir rate limits
-                if current_index < min(total_rows, start_index + max_requests):
-                    logger.info(f"Aguardando {EXPERIMENT_WAIT_TIME}s antes do próximo lote...")
-                    time.sleep(EXPERIMENT_WAIT_TIME)
-            
-            if last_idx < end_index - 1:
-                logger.warning(f"Processamento interrompido no índice {last_idx}")
-                break
+                current_index = end_index
+                
+                if not batch_df.empty:
+                    batch_frames.append(batch_df)
+                
+                if output_fh is not None:
+                    total_records += len(batch_df)
+                    # Um checkpoint por vez, em segundo plano, enquanto o próximo lote é processado
+                    if pending_checkpoint is not None:
+                        wait_checkpoint(pending_checkpoint)
+                    pending_checkpoint = (end_index, checkpoint_executor.submit(
+                        save_checkpoint,
+                        output_fh, 
+                        llm_config, 
+                        end_index,
+                        total_records
+                    ))
                 
+                if last_idx < end_index - 1:
+                    logger.warning("Processamento interrompido no índice %d", last_idx)
+                    break
+        finally:
+            await llm_client.aclose()
+    
+    try:
+        asyncio.run(process_batches())
     except KeyboardInterrupt:
         logger.warning("Processamento interrompido pelo usuário")
     except Exception as e:
         logger.error(f"Erro durante processamento: {str(e)}")
+    finally:
+        checkpoint_executor.shutdown(wait=True)
+        if pending_checkpoint is not None:
+            wait_checkpoint(pending_checkpoint)
+        if output_fh is not None:
+            output_fh.close()
+    
+    result_df = pd.concat(batch_frames, ignore_index=True) if batch_frames else pd.DataFrame()
     
     elapsed_time = time.time() - start_time
     last_processed_index = current_index - 1 if current_index > start_index else start_index
@@ -226,12 +339,13 @@ def main():
     
     result_df, last_processed_index = process_data(
         df, 
-        llm_client.generate_content,
+        llm_client,
         start_index=EXPERIMENT_START_INDEX,
         max_requests=EXPERIMENT_MAX_REQUESTS,
         checkpoint_interval=EXPERIMENT_CHECKPOINT_INTERVAL,
         project_root=project_root,
-        llm_config=llm_config
+        llm_config=llm_config,
+        prompts_per_request=EXPERIMENT_BATCH_SIZE
     )
     
     save_results(result_df, llm_config, project_root, last_processed_index)
@@ -241,14 +355,71 @@ def main():
     logger.success(f"Tempo total: {elapsed_time:.2f}s")
 
 
-def regenerate_failed_resolutions(input_file, llm_client, wait_time=EXPERIMENT_WAIT_TIME, output_file=None, save_to_original=False):
+@lru_cache(maxsize=4)
+def load_original_dataset(data_path):
+    """
+    Carrega o dataset original indexado por ID (primeira ocorrência de cada ID).
+    O resultado fica em cache, então processar vários arquivos de resultados do
+    mesmo repositório lê o JSONL uma única vez. O DataFrame retornado é
+    compartilhado e não deve ser modificado.
+    
+    Args:
+        data_path (str): Caminho do arquivo JSONL do dataset
+        
+    Returns:
+        pandas.DataFrame: Dataset indexado pela coluna 'id'
+    """
+    original_df = read_jsonl(data_path, columns=INPUT_COLUMNS)
+    return original_df.drop_duplicates('id').set_index('id')
+
+
+async def regenerate_resolutions(pending, generate_content_fn, requests_per_minute=EXPERIMENT_REQUESTS_PER_MINUTE,
+                                 max_concurrent=EXPERIMENT_MAX_CONCURRENT):
+    """
+    Gera novamente as resoluções de uma lista de prompts, com requisições
+    concorrentes limitadas pelo rate limiter e novas tentativas em caso de
+    rate limit ou timeout.
+    
+    Args:
+        pending (list): Tuplas (índice do resultado, ID, prompt)
+        generate_content_fn: Função assíncrona que gera o conteúdo a partir do prompt
+            (as instruções vão separadas, como instrução de sistema)
+        requests_per_minute (int): Limite de requisições por minuto do provider
+        max_concurrent (int): Número máximo de requisições simultâneas
+        
+    Returns:
+        list: Resolução gerada ou exceção, na mesma ordem de `pending`
+    """
+    limiter = AsyncRateLimiter(requests_per_minute, max_concurrent)
+    
+    async def worker(n, result_id, prompt):
+        def on_attempt(attempt_number):
+            if attempt_number > 1:
+                logger.warning("Nova tentativa (%d) para o ID %s", attempt_number, result_id)
+            logger.info("Processando %d/%d: ID %s", n, len(pending), result_id)
+        
+        response_text, elapsed_time = await call_with_limits(
+            limiter, generate_content_fn, prompt, system_instruction=system_prompt, on_attempt=on_attempt
+        )
+        logger.success("Resolução para ID %s gerada em %.2fs", result_id, elapsed_time)
+        return response_text
+    
+    return await asyncio.gather(
+        *(worker(n, result_id, prompt) for n, (_, result_id, prompt) in enumerate(pending, start=1)),
+        return_exceptions=True
+    )
+
+
+def regenerate_failed_resolutions(input_file, llm_client, requests_per_minute=EXPERIMENT_REQUESTS_PER_MINUTE,
+                                  max_concurrent=EXPERIMENT_MAX_CONCURRENT, output_file=None, save_to_original=False):
     """
     Regenera as resoluções de conflitos que falharam devido a erros na API do LLM.
     
     Args:
         input_file (str): Caminho para o arquivo JSON com os resultados
         llm_client (LLMClient): Cliente LLM configurado
-        wait_time (int): Tempo de espera entre requisições
+        requests_per_minute (int): Limite de requisições por minuto do provider
+        max_concurrent (int): Número máximo de requisições simultâneas
         output_file (str, optional): Caminho para salvar o novo arquivo
         save_to_original (bool): Se True, substitui o arquivo original
         
@@ -272,18 +443,14 @@ def regenerate_failed_resolutions(input_file, llm_client, wait_time=EXPERIMENT_W
         logger.error(f"Erro ao carregar o arquivo: {str(e)}")
         return None
     
-    # Identificar resoluções com erro
-    failed_indices = []
-    for i, result in enumerate(results):
-        resolution = result.get('conflict_resolution', '')
-        # Verificar se contém mensagens de erro
-        if isinstance(resolution, str) and (
-            resolution.startswith("Erro ao gerar") or 
-            "Error generating content" in resolution or 
-            "RateLimitError" in resolution or
-            "rate_limit_exceeded" in resolution
-        ):
-            failed_indices.append(i)
+    # Identificar resoluções com erro: pelo status, ou pela mensagem em arquivos
+    # gerados antes do campo existir (valores que não são string nunca casam)
+    import pandas as pd
+    statuses = pd.Series([result.get('status') for result in results], dtype=object)
+    resolutions = pd.Series([result.get('conflict_resolution') for result in results], dtype=object)
+    resolutions = resolutions.where(resolutions.map(type) == str)
+    failed_mask = (statuses == 'error') | (statuses.isna() & resolutions.str.contains(FAILED_RESOLUTION_RE, na=False))
+    failed_indices = failed_mask.to_numpy().nonzero()[0].tolist()
     
     logger.info(f"Encontradas {len(failed_indices)} resoluções com erro")
     
@@ -300,7 +467,7 @@ def regenerate_failed_resolutions(input_file, llm_client, wait_time=EXPERIMENT_W
         # Tentar encontrar um arquivo JSONL correspondente
         data_dir = os.path.join(project_root, INPUT_DATA_DIR, repository_name)
         if os.path.exists(data_dir):
-            jsonl_files = [f for f in os.listdir(data_dir) if f.endswith('.jsonl')]
+            jsonl_files = [entry.name for entry in os.scandir(data_dir) if entry.name.endswith('.jsonl') and entry.is_file()]
             if jsonl_files:
                 data_path = os.path.join(data_dir, jsonl_files[0])
             else:
@@ -310,45 +477,55 @@ def regenerate_failed_resolutions(input_file, llm_client, wait_time=EXPERIMENT_W
             logger.error(f"Diretório do dataset não encontrado: {data_dir}")
             return None
     
-    # Carregar o dataset original
-    original_df = pd.read_json(data_path, lines=True)
+    # Carregar o dataset original (reaproveitado entre arquivos do mesmo repositório)
+    original_by_id = load_original_dataset(data_path)
     
-    # Regenerar as resoluções com erro
-    for idx, result_idx in enumerate(failed_indices):
-        result = results[result_idx]
-        result_id = result.get('id')
-        
-        logger.info(f"Processando {idx+1}/{len(failed_indices)}: ID {result_id}")
-        
+    # Buscar de uma vez (isin) os conflitos originais de todas as resoluções com erro
+    wanted_ids = [results[result_idx].get('id') for result_idx in failed_indices]
+    needed = original_by_id[original_by_id.index.isin(wanted_ids)]
+    original_rows = dict(zip(
+        needed.index.tolist(),
+        zip(needed['conflict_tuple'].tolist(), needed['commit_message'].tolist())
+    ))
+    
+    # Montar os prompts das resoluções com erro
+    pending = []
+    for result_idx, result_id in zip(failed_indices, wanted_ids):
         # Encontrar dados originais
-        original_data = original_df[original_df['id'] == result_id]
-        if len(original_data) == 0:
-            logger.warning(f"ID {result_id} não encontrado no dataset original. Pulando.")
+        if result_id not in original_rows:
+            logger.warning("ID %s não encontrado no dataset original. Pulando.", result_id)
             continue
         
-        original_row = original_data.iloc[0]
-        
+        conflict_tuple, commit_message = original_rows[result_id]
         try:
-            from .prompt import create_prompt
-            prompt = create_prompt(original_row['conflict_tuple'], original_row['commit_message'])
-            
-            logger.info(f"Gerando nova resolução...")
-            start_time = time.time()
-            response_text = llm_client.generate_content(prompt)
-            elapsed_time = time.time() - start_time
-            
-            logger.success(f"Resolução gerada em {elapsed_time:.2f}s")
-            
-            # Atualizar o resultado
-            results[result_idx]['conflict_resolution'] = response_text
-            
+            prompt = create_user_prompt(conflict_tuple, commit_message)
         except Exception as e:
-            logger.error(f"Erro ao gerar resolução para ID {result_id}: {str(e)}")
+            logger.error("Erro ao gerar resolução para ID %s: %s", result_id, e)
+            continue
         
-        # Aguardar entre requisições
-        if idx < len(failed_indices) - 1:
-            logger.info(f"Aguardando {wait_time}s antes da próxima requisição...")
-            time.sleep(wait_time)
+        pending.append((result_idx, result_id, prompt))
+    
+    # Regenerar as resoluções com erro em paralelo, respeitando o rate limit
+    async def regenerate_pending():
+        try:
+            return await regenerate_resolutions(
+                pending,
+                llm_client.generate_content_async,
+                requests_per_minute=requests_per_minute,
+                max_concurrent=max_concurrent
+            )
+        finally:
+            await llm_client.aclose()
+    
+    responses = asyncio.run(regenerate_pending())
+    
+    for (result_idx, result_id, _), response in zip(pending, responses):
+        if isinstance(response, Exception):
+            logger.error("Erro ao gerar resolução para ID %s: %s", result_id, response)
+        else:
+            # Atualizar o resultado
+            results[result_idx]['conflict_resolution'] = response
+            results[result_idx]['status'] = 'ok'
     
     # Preparar caminho de saída
     if not output_file:
@@ -371,8 +548,13 @@ def regenerate_failed_resolutions(input_file, llm_client, wait_time=EXPERIMENT_W
     }
     
     try:
-        with open(output_file, 'w') as f:
-            json.dump(output_data, f, indent=2)
+        # Grava num arquivo temporário e substitui: o original (save_to_original) nunca fica pela metade
+        tmp_path = output_file + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, output_file)
         
         logger.success(f"Resultados salvos em: {output_file}")
         return output_file
@@ -393,8 +575,10 @@ def regenerate_main():
                         help='Caminho para o arquivo JSON com os resultados ou padrão glob')
     parser.add_argument('--output', type=str, 
                         help='Caminho para salvar o novo arquivo JSON (opcional)')
-    parser.add_argument('--wait-time', type=int, default=EXPERIMENT_WAIT_TIME,
-                        help=f'Tempo de espera entre requisições (padrão: {EXPERIMENT_WAIT_TIME}s)')
+    parser.add_argument('--requests-per-minute', type=int, default=EXPERIMENT_REQUESTS_PER_MINUTE,
+                        help=f'Limite de requisições por minuto (padrão: {EXPERIMENT_REQUESTS_PER_MINUTE})')
+    parser.add_argument('--max-concurrent', type=int, default=EXPERIMENT_MAX_CONCURRENT,
+                        help=f'Número máximo de requisições simultâneas (padrão: {EXPERIMENT_MAX_CONCURRENT})')
     parser.add_argument('--glob', action='store_true',
                         help='Tratar o input como um padrão glob e processar múltiplos arquivos')
     parser.add_argument('--overwrite', action='store_true',
@@ -433,7 +617,8 @@ def regenerate_main():
             regenerate_failed_resolutions(
                 input_file=input_file,
                 llm_client=llm_client,
-                wait_time=args.wait_time,
+                requests_per_minute=args.requests_per_minute,
+                max_concurrent=args.max_concurrent,
                 output_file=output_file,
                 save_to_original=args.overwrite
             )
@@ -441,7 +626,8 @@ def regenerate_main():
         regenerate_failed_resolutions(
             input_file=args.input,
             llm_client=llm_client,
-            wait_time=args.wait_time,
+            requests_per_minute=args.requests_per_minute,
+            max_concurrent=args.max_concurrent,
             output_file=args.output,
             save_to_original=args.overwrite
         )
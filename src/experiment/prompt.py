@@ -1,3 +1,6 @@
+import re
+import textwrap
+
 system_prompt = '''
 # Git Merge Conflict Resolution Assistant
 
@@ -73,18 +76,116 @@ The resolved code should be ready to replace the conflict markers in the origina
 '''
 
 
-def create_prompt(conflict_tuple, commit_message):
+BATCH_INSTRUCTIONS = '''
+## Batch Format
+This request contains several independent conflicts. Each one is delimited by
+`<<<ID n>>>` and `<<<END n>>>`, where n is the conflict number.
+Resolve each conflict separately and wrap every resolution in the same delimiters, for example:
+<<<ID 1>>>
+resolved code for conflict 1
+<<<END 1>>>
+Do not write anything outside the delimiters.
+
+## Resolve the following conflicts:
+'''
+
+TRAILING_SPACES_PATTERN = re.compile(r"[ \t]+$", re.MULTILINE)
+BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+
+
+def _compact_prompt(text):
+    """Remove indentação, espaços no fim das linhas e linhas em branco repetidas, que também viram tokens."""
+    text = textwrap.dedent(text)
+    text = TRAILING_SPACES_PATTERN.sub("", text)
+    return BLANK_LINES_PATTERN.sub("\n\n", text).strip()
+
+
+system_prompt = _compact_prompt(system_prompt)
+
+BATCH_SYSTEM_PROMPT = _compact_prompt(system_prompt.replace("## Resolve the following conflict:", "") + BATCH_INSTRUCTIONS)
+
+BATCH_RESPONSE_PATTERN = re.compile(r'<<<ID (\d+)>>>\n?(.*?)\n?<<<END \1>>>', re.DOTALL)
+
+
+def check_conflict_tuple(conflict_tuple):
+    """
+    Valida um conflito antes de montar o prompt. Em prompts com vários
+    conflitos, permite descartar só o inválido em vez do lote inteiro.
+
+    Raises:
+        ValueError: Se conflict_tuple não for um dicionário
+    """
     if not isinstance(conflict_tuple, dict):
         raise ValueError("conflict_tuple não é um dicionário válido")
 
-    a_content = conflict_tuple.get("a_content", "N/A")
-    base_content = conflict_tuple.get("base_content", "N/A")
-    b_content = conflict_tuple.get("b_content", "N/A")
+
+def _get_conflict_contents(conflict_tuple):
+    check_conflict_tuple(conflict_tuple)
+
+    # None cobre chaves com null no arquivo e as ausentes num struct lido pelo pyarrow
+    a_content, b_content, base_content = (
+        value if value is not None else "N/A"
+        for value in (conflict_tuple.get(field) for field in ("a_content", "b_content", "base_content"))
+    )
+
+    return a_content, b_content, base_content
+
+
+# Single-conflict template, built once at import; filled with a, b, base and commit message
+_USER_PROMPT_TEMPLATE = "A_CONTENT: {}\nB_CONTENT: {}\nBASE_CONTENT: {}\nCOMMIT_MESSAGE: {}"
+
+
+def create_user_prompt(conflict_tuple, commit_message):
+    """
+    Cria só a parte do prompt com o conflito, para ser enviada como mensagem do
+    usuário com `system_prompt` como instrução de sistema. Assim o prefixo é
+    idêntico em todas as requisições e pode ser reaproveitado pelo cache de
+    prompt do provider.
+
+    Args:
+        conflict_tuple: Dicionário com a_content, b_content e base_content
+        commit_message: Mensagem do commit do merge
+
+    Returns:
+        str: Conflito e mensagem de commit, sem as instruções
+    """
+    a_content, b_content, base_content = _get_conflict_contents(conflict_tuple)
     
-    return (
-        f"""{system_prompt}
-        A_CONTENT: {a_content}
-        B_CONTENT: {b_content}
-        BASE_CONTENT: {base_content}
-        COMMIT_MESSAGE: {commit_message}"""
-    )
\ No newline at end of file
+    return _USER_PROMPT_TEMPLATE.format(a_content, b_content, base_content, commit_message)
+
+
+def create_batch_user_prompt(rows):
+    """
+    Cria a parte com os conflitos de um prompt em lote, para ser enviada como
+    mensagem do usuário com `BATCH_SYSTEM_PROMPT` como instrução de sistema.
+
+    Args:
+        rows: Lista de pares (conflict_tuple, commit_message)
+
+    Returns:
+        str: Cada conflito entre os delimitadores <<<ID n>>> e <<<END n>>>
+    """
+    conflicts = []
+    for n, (conflict_tuple, commit_message) in enumerate(rows, start=1):
+        a_content, b_content, base_content = _get_conflict_contents(conflict_tuple)
+        conflicts.append(
+            f"<<<ID {n}>>>\n"
+            f"A_CONTENT: {a_content}\n"
+            f"B_CONTENT: {b_content}\n"
+            f"BASE_CONTENT: {base_content}\n"
+            f"COMMIT_MESSAGE: {commit_message}\n"
+            f"<<<END {n}>>>"
+        )
+
+    return "\n".join(conflicts)
+
+
+def parse_batch_response(response_text):
+    """
+    Extrai as resoluções da resposta a um prompt criado por create_batch_user_prompt
+    (enviado com `BATCH_SYSTEM_PROMPT` como instrução de sistema).
+
+    Returns:
+        dict: Número do conflito (int) -> resolução (str)
+    """
+    return {int(n): resolution for n, resolution in BATCH_RESPONSE_PATTERN.findall(response_text or "")}
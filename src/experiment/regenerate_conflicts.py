@@ -8,29 +8,48 @@ Uso:
 
 Argumentos:
     --input: Caminho para o arquivo JSON com os resultados (pode ser um padrão glob com --glob)
-    --output: (Opcional) Caminho para salvar o novo arquivo JSON
+    --output: (Opcional) Caminho para salvar o novo arquivo JSON (só com um arquivo de entrada)
+    --requests-per-minute: Limite de requisições por minuto do provider
+    --max-concurrent: Número máximo de requisições simultâneas
+    --batch-size: Conflitos enviados em cada requisição
+    --use-batch-api: Enviar todas as requisições como um único job da Batch API (só Google)
+    --batch-timeout-hours: Espera máxima pelo job da Batch API antes de usar requisições individuais
+    --no-cache: Não reaproveitar resoluções já geradas para conflitos idênticos
     --glob: Tratar o input como um padrão glob para processar múltiplos arquivos
+    --file-workers: Número de arquivos processados ao mesmo tempo com --glob
     --overwrite: Sobrescrever os arquivos originais em vez de criar novos
 """
 
-import json
+import asyncio
+import hashlib
 import os
+import re
+import sqlite3
 import sys
-import time
+import threading
 import argparse
-import pandas as pd
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
 from glob import glob
 
 # Importar recursos necessários do projeto
 from .llm.llm_client import LLMClient
+from .llm.rate_limiter import AsyncRateLimiter, call_with_limits
 from .config.cli_config import setup_cli_parser, get_llm_config_from_args
-from .prompt import create_prompt
+from .prompt import BATCH_SYSTEM_PROMPT, check_conflict_tuple, create_batch_user_prompt, create_user_prompt, parse_batch_response, system_prompt
 from .utils import logger, get_project_root
 
 # Configurações padrão
-DEFAULT_WAIT_TIME = 60  # Tempo de espera entre requisições para evitar rate limits
+DEFAULT_REQUESTS_PER_MINUTE = 15  # Limite de requisições por minuto do provider
+DEFAULT_MAX_CONCURRENT = 5  # Requisições simultâneas ao LLM
+DEFAULT_BATCH_SIZE = 1  # Conflitos por requisição
+DEFAULT_FILE_WORKERS = 4  # Arquivos processados ao mesmo tempo com --glob
+DEFAULT_BATCH_TIMEOUT_HOURS = 24  # Espera máxima pelo job da Batch API
+FAILED_RESOLUTION_BYTES_RE = re.compile(rb'"status":\s*"error"|"conflict_resolution":\s*"Erro ao gerar')  # Busca no JSON bruto, sem parse
+CACHE_PATH = os.path.join('data', 'cache', 'resolutions.db')  # Relativo à raiz do projeto
+CACHE_LOCK = threading.Lock()  # A conexão do cache é compartilhada pelas threads de todos os arquivos
 
 def setup_argument_parser():
     """Configura o parser de argumentos de linha de comando."""
@@ -41,10 +60,22 @@ def setup_argument_parser():
                         help='Caminho para o arquivo JSON com os resultados')
     parser.add_argument('--output', type=str, 
                         help='Caminho para salvar o novo arquivo JSON (opcional)')
-    parser.add_argument('--wait-time', type=int, default=DEFAULT_WAIT_TIME,
-                        help=f'Tempo de espera entre requisições (padrão: {DEFAULT_WAIT_TIME}s)')
+    parser.add_argument('--requests-per-minute', type=int, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help=f'Limite de requisições por minuto (padrão: {DEFAULT_REQUESTS_PER_MINUTE})')
+    parser.add_argument('--max-concurrent', type=int, default=DEFAULT_MAX_CONCURRENT,
+                        help=f'Número máximo de requisições simultâneas (padrão: {DEFAULT_MAX_CONCURRENT})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Conflitos enviados em cada requisição (padrão: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--use-batch-api', action='store_true',
+                        help='Enviar as requisições pela Batch API do provider (mais barata, sem limite por minuto, resultado em até 24h)')
+    parser.add_argument('--batch-timeout-hours', type=float, default=DEFAULT_BATCH_TIMEOUT_HOURS,
+                        help=f'Horas de espera pelo job da Batch API antes de cancelá-lo e usar requisições individuais (padrão: {DEFAULT_BATCH_TIMEOUT_HOURS})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Não reaproveitar resoluções em cache de conflitos idênticos (mesmo A, B e BASE)')
     parser.add_argument('--glob', action='store_true',
                         help='Tratar o input como um padrão glob e processar múltiplos arquivos')
+    parser.add_argument('--file-workers', type=int, default=DEFAULT_FILE_WORKERS,
+                        help=f'Arquivos processados ao mesmo tempo com --glob (padrão: {DEFAULT_FILE_WORKERS})')
     parser.add_argument('--overwrite', action='store_true',
                         help='Sobrescrever o arquivo original em vez de criar um novo')
     
@@ -63,12 +94,12 @@ def setup_argument_parser():
     return parser
 
 def load_results(input_file):
-    """Carrega os resultados do arquivo JSON."""
+    """Carrega os resultados do arquivo JSON. Retorna None se o arquivo não puder ser lido."""
     logger.section(f"Carregando resultados de {input_file}")
     
     try:
-        with open(input_file, 'r') as f:
-            data = json.load(f)
+        with open(input_file, 'rb') as f:
+            data = orjson.loads(f.read())
         
         if isinstance(data, dict) and 'results' in data:
             # Formato com metadata
@@ -83,8 +114,8 @@ def load_results(input_file):
         return metadata, results
     
     except Exception as e:
-        logger.error(f"Erro ao carregar o arquivo: {str(e)}")
-        sys.exit(1)
+        logger.error(f"Erro ao carregar o arquivo {input_file}: {str(e)}")
+        return None
 
 def find_dataset_file(repository_name):
     """Encontra o arquivo de dataset para o repositório especificado."""
@@ -106,121 +137,447 @@ def find_dataset_file(repository_name):
     logger.error(f"Não foi possível encontrar o dataset para o repositório: {repository_name}")
     return None
 
+def load_original_conflicts(dataset_file, wanted_ids):
+    """
+    Lê o dataset JSONL linha a linha e guarda só os registros com ID em
+    `wanted_ids` (primeira ocorrência de cada um), sem montar um DataFrame.
+    
+    Returns:
+        dict: ID -> registro do dataset
+    """
+    by_id = {}
+    with open(dataset_file, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = orjson.loads(line)
+            result_id = record.get('id')
+            if result_id in wanted_ids and result_id not in by_id:
+                by_id[result_id] = record
+    return by_id
+
+def is_failed_resolution(result):
+    """
+    Indica se o resultado falhou por erro na API. Resultados com o campo
+    `status` são decididos por ele; nos arquivos gerados antes do campo
+    existir, pelo prefixo da mensagem de erro em `conflict_resolution`.
+    """
+    status = result.get('status')
+    if status is not None:
+        return status == 'error'
+    resolution = result.get('conflict_resolution')
+    return isinstance(resolution, str) and resolution.startswith("Erro ao gerar")
+
 def identify_failed_resolutions(results):
     """Identifica as resoluções que falharam devido a erros."""
-    failed_indices = []
-    for i, result in enumerate(results):
-        resolution = result.get('conflict_resolution', '')
+    return [i for i, result in enumerate(results) if is_failed_resolution(result)]
+
+def get_output_file(input_file, args):
+    """Determina o caminho do arquivo JSON de saída."""
+    if args.output:
+        return args.output
+    if args.overwrite:
+        return input_file
+    base_name, ext = os.path.splitext(input_file)
+    return f"{base_name}_fixed{ext}"
+
+def get_progress_file(output_file):
+    """Arquivo JSONL ao lado da saída onde cada resolução regenerada é gravada assim que chega."""
+    return os.path.splitext(output_file)[0] + ".progress.jsonl"
+
+def group_duplicate_conflicts(entries, cached_resolution):
+    """
+    Separa os conflitos que precisam ir ao LLM. Cada conflito distinto (mesmo
+    A, B e BASE) é pedido uma única vez; os já resolvidos vêm do cache.
+    
+    Args:
+        entries: Lista de (índice do resultado, ID, conflict_tuple, commit_message)
+        cached_resolution: Função chave -> resolução em cache (ou None)
+        
+    Returns:
+        tuple: (pendentes, {chave: resolução em cache}, {chave: entradas que
+            recebem a mesma resolução}). Para chaves pendentes, as entradas
+            são só as repetições; para chaves em cache, todas as ocorrências.
+    """
+    pending = []
+    cached = {}
+    duplicates = {}
+    for entry in entries:
+        key = get_conflict_key(entry[2])
+        if key in duplicates:
+            duplicates[key].append(entry)
+            continue
         
-        # Verificar se a string contém indicações de erro
-        if isinstance(resolution, str) and (
-            resolution.startswith("Erro ao gerar")
-        ):
-            failed_indices.append(i)
+        resolution = cached_resolution(key)
+        if resolution is not None:
+            cached[key] = resolution
+            duplicates[key] = [entry]
+        else:
+            pending.append(entry)
+            duplicates[key] = []
+    return pending, cached, duplicates
+
+def needs_regeneration(input_file, args):
+    """
+    Verificação barata, sem fazer o parse do JSON, de que o arquivo tem
+    resoluções com erro ou progresso de uma execução anterior a aplicar.
+    Um arquivo que não pode ser lido segue adiante, para que o erro seja
+    reportado só para ele em `process_file`.
+    """
+    if os.path.exists(get_progress_file(get_output_file(input_file, args))):
+        return True
+    try:
+        with open(input_file, 'rb') as f:
+            return FAILED_RESOLUTION_BYTES_RE.search(f.read()) is not None
+    except OSError as e:
+        logger.warning(f"Não foi possível verificar {input_file}: {str(e)}")
+        return True
+
+def load_progress(progress_file, results):
+    """
+    Aplica aos resultados as resoluções gravadas por uma execução anterior
+    interrompida, para que não sejam pedidas de novo ao LLM.
     
-    return failed_indices
+    Returns:
+        int: Número de resoluções recuperadas
+    """
+    if not os.path.exists(progress_file):
+        return 0
+    
+    resumed = 0
+    with open(progress_file, 'rb') as f:
+        for line in f:
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                # Última linha incompleta se a execução anterior caiu no meio da escrita
+                continue
+            
+            result_idx = record['index']
+            if result_idx < len(results) and results[result_idx].get('id') == record['id']:
+                results[result_idx]['conflict_resolution'] = record['conflict_resolution']
+                results[result_idx]['status'] = 'ok'
+                resumed += 1
+    
+    logger.info(f"Recuperadas {resumed} resoluções de {progress_file}")
+    return resumed
 
-def process_file(input_file, llm_client, args):
-    """Processa um único arquivo de resultados."""
-    # Carregar resultados
-    metadata, results = load_results(input_file)
+def open_resolution_cache():
+    """Abre (criando se necessário) o cache SQLite de resoluções por conflito e modelo."""
+    cache_path = os.path.join(get_project_root(), CACHE_PATH)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    
+    # Usada pelas threads de asyncio.to_thread; o acesso é serializado por CACHE_LOCK
+    cache = sqlite3.connect(cache_path, check_same_thread=False)
+    # Tabela "conflict_resolutions": a antiga "resolutions" usava chaves ambíguas e é ignorada
+    cache.execute(
+        "CREATE TABLE IF NOT EXISTS conflict_resolutions ("
+        "model TEXT NOT NULL, conflict_key TEXT NOT NULL, resolution TEXT NOT NULL, "
+        "PRIMARY KEY (model, conflict_key))"
+    )
+    return cache
+
+def lookup_cached_resolutions(cache, model, keys):
+    """Busca no cache as resoluções já geradas pelo modelo. Returns: dict chave -> resolução"""
+    found = {}
+    with CACHE_LOCK:
+        for key in keys:
+            row = cache.execute(
+                "SELECT resolution FROM conflict_resolutions WHERE model = ? AND conflict_key = ?", (model, key)
+            ).fetchone()
+            if row is not None:
+                found[key] = row[0]
+    return found
+
+def write_progress(progress, lines, cache=None, cache_rows=()):
+    """
+    Grava as linhas no arquivo de progresso (append + fsync) e as resoluções
+    novas no cache. Bloqueante: chamada via asyncio.to_thread.
+    """
+    progress.write(b"".join(lines))
+    progress.flush()
+    os.fsync(progress.fileno())
+    if cache is not None and cache_rows:
+        with CACHE_LOCK:
+            cache.executemany(
+                "INSERT OR REPLACE INTO conflict_resolutions (model, conflict_key, resolution) VALUES (?, ?, ?)",
+                cache_rows
+            )
+            cache.commit()
+
+def get_conflict_key(conflict_tuple):
+    """
+    Hash do conteúdo A, B e BASE de um conflito, usado como chave do cache.
+    Os campos são codificados como uma lista JSON, sem ambiguidade mesmo
+    quando o código contém o separador (ex.: "p|" + "q" e "p" + "|q").
+    """
+    contents = [conflict_tuple.get(field, '') for field in ('a_content', 'b_content', 'base_content')]
+    return hashlib.blake2b(orjson.dumps(contents), digest_size=16).hexdigest()
+
+def save_results(output_file, output_data, progress_file):
+    """
+    Grava os resultados num arquivo temporário e o move para `output_file`, de
+    modo que o original (--overwrite) nunca fica pela metade. Depois remove o
+    arquivo de progresso, que não é mais necessário.
+    
+    Returns:
+        str: Caminho do arquivo salvo, ou None em caso de erro
+    """
+    try:
+        tmp_path = output_file + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, output_file)
+        
+        # Tudo já está na saída final; o progresso parcial não é mais necessário
+        if os.path.exists(progress_file):
+            os.remove(progress_file)
+        
+        logger.success(f"Resultados salvos em: {output_file}")
+        return output_file
+    except Exception as e:
+        logger.error(f"Erro ao salvar resultados: {str(e)}")
+        return None
+
+async def process_file(input_file, llm_client, args, limiter, cache=None):
+    """
+    Processa um único arquivo de resultados, com as requisições no ritmo de
+    `limiter` e as resoluções reaproveitadas de `cache` (None desativa o cache).
+    """
+    # Carregar resultados fora do event loop, para não travar as requisições dos outros arquivos
+    loaded = await asyncio.to_thread(load_results, input_file)
+    if loaded is None:
+        return None
+    metadata, results = loaded
+    
+    # Retomar de uma execução anterior, se houver progresso gravado
+    output_file = get_output_file(input_file, args)
+    progress_file = get_progress_file(output_file)
+    resumed_count = load_progress(progress_file, results)
     
     # Identificar resoluções com erro
     failed_indices = identify_failed_resolutions(results)
     
-    if not failed_indices:
+    if not failed_indices and not resumed_count:
         logger.info(f"Nenhuma resolução com erro encontrada em {input_file}. Nada a fazer.")
         return
     
     logger.info(f"Encontradas {len(failed_indices)} resoluções com erro")
     
+    if failed_indices:
+        updated_count = await regenerate_failed(results, failed_indices, metadata, progress_file, llm_client, args, limiter, cache)
+        if updated_count is None:
+            return None
+    else:
+        updated_count = 0
+    
+    logger.success(f"Regeneradas {updated_count} resoluções com sucesso")
+    
+    # Atualizar metadata
+    metadata.update({
+        'regeneration_timestamp': datetime.now().isoformat(),
+        'regenerated_count': resumed_count + updated_count,
+        'total_records': len(results)
+    })
+    
+    # Salvar resultados
+    output_data = {
+        'metadata': metadata,
+        'results': results
+    }
+    
+    # Gravar fora do event loop, como a leitura
+    return await asyncio.to_thread(save_results, output_file, output_data, progress_file)
+
+async def regenerate_failed(results, failed_indices, metadata, progress_file, llm_client, args, limiter, cache=None):
+    """
+    Regenera as resoluções com erro, atualizando `results` e gravando cada
+    resolução em `progress_file` (append + fsync) e em `cache` assim que ela
+    chega. As gravações rodam fora do event loop, que é compartilhado pelos
+    arquivos processados ao mesmo tempo.
+    
+    Returns:
+        int: Número de resoluções regeneradas, ou None se não foi possível regenerar
+            (dataset original não encontrado)
+    """
     # Determinar o repositório e carregar o dataset original
     repository_name = metadata.get('repository_name', 'elastic')
     dataset_file = find_dataset_file(repository_name)
     
     if not dataset_file:
-        logger.error(f"Não foi possível processar o arquivo {input_file} sem o dataset original")
-        return
+        logger.error(f"Não foi possível regenerar as resoluções sem o dataset original de {repository_name}")
+        return None
     
-    # Carregar o dataset original
-    dataset_df = pd.read_json(dataset_file, lines=True)
+    # Carregar do dataset original só os conflitos com erro
+    wanted_ids = {results[result_idx].get('id') for result_idx in failed_indices}
+    by_id = await asyncio.to_thread(load_original_conflicts, dataset_file, wanted_ids)
     logger.success(f"Dataset original carregado: {dataset_file}")
     
-    # Regenerar resoluções com erro
-    updated_count = 0
-    total = len(failed_indices)
-    
-    for idx, result_idx in enumerate(failed_indices):
-        result = results[result_idx]
-        result_id = result.get('id')
-        
-        logger.info(f"Processando {idx+1}/{total}: ID {result_id}")
+    # Encontrar os dados originais de cada conflito com erro
+    entries = []
+    for result_idx in failed_indices:
+        result_id = results[result_idx].get('id')
+        original_row = by_id.get(result_id)
         
-        # Encontrar os dados originais do conflito
-        original_data = dataset_df[dataset_df['id'] == result_id]
-        
-        if len(original_data) == 0:
-            logger.warning(f"ID {result_id} não encontrado no dataset original. Pulando.")
+        if original_row is None:
+            logger.warning("ID %s não encontrado no dataset original. Pulando.", result_id)
             continue
         
-        original_row = original_data.iloc[0]
-        
+        # Um conflito inválido fica com erro sozinho, sem derrubar o lote em que seria enviado
         try:
-            # Criar prompt e gerar nova resolução
-            prompt = create_prompt(original_row['conflict_tuple'], original_row['commit_message'])
-            
-            logger.info(f"Gerando nova resolução...")
-            start_time = time.time()
-            response_text = llm_client.generate_content(prompt)
-            elapsed_time = time.time() - start_time
-            
-            logger.success(f"Resolução gerada em {elapsed_time:.2f}s")
-            
-            # Atualizar o resultado
-            results[result_idx]['conflict_resolution'] = response_text
-            updated_count += 1
-            
-        except Exception as e:
-            logger.error(f"Erro ao gerar resolução: {str(e)}")
+            check_conflict_tuple(original_row['conflict_tuple'])
+        except ValueError as e:
+            logger.error("Erro ao gerar resolução para ID %s: %s", result_id, e)
+            continue
         
-        # Aguardar entre requisições para evitar rate limits
-        if idx < total - 1:
-            logger.info(f"Aguardando {args.wait_time}s antes da próxima requisição...")
-            time.sleep(args.wait_time)
+        entries.append((result_idx, result_id, original_row['conflict_tuple'], original_row['commit_message']))
     
-    logger.success(f"Regeneradas {updated_count} resoluções com sucesso")
+    # Conflitos idênticos (mesmo A, B e BASE) são pedidos ao LLM uma única vez:
+    # os já resolvidos pelo modelo vêm do cache e as repetições recebem a mesma resposta
+    model = f"{llm_client.config.provider}/{llm_client.config.model}"
+    if cache is not None:
+        keys = {get_conflict_key(entry[2]) for entry in entries}
+        found = await asyncio.to_thread(lookup_cached_resolutions, cache, model, keys)
+    else:
+        found = {}
+    
+    entries, cached, duplicates = group_duplicate_conflicts(entries, found.get)
+    
+    if cached:
+        logger.info(f"{sum(len(duplicates[key]) for key in cached)} resoluções encontradas no cache")
+    
+    # Regenerar resoluções com erro no ritmo permitido pelo provider, com
+    # batch_size conflitos por requisição
+    batch_size = max(1, args.batch_size)
+    batches = [entries[i:i + batch_size] for i in range(0, len(entries), batch_size)]
+    total = len(batches)
+    
+    def batch_prompt(batch):
+        if batch_size == 1:
+            _, _, conflict_tuple, commit_message = batch[0]
+            return create_user_prompt(conflict_tuple, commit_message), system_prompt
+        prompt = create_batch_user_prompt((conflict_tuple, commit_message) for _, _, conflict_tuple, commit_message in batch)
+        return prompt, BATCH_SYSTEM_PROMPT
     
-    # Determinar caminho de saída
-    output_file = args.output
-    if not output_file:
-        if args.overwrite:
-            output_file = input_file
+    def parse_response(response_text):
+        if batch_size == 1:
+            return {1: response_text}
+        return parse_batch_response(response_text)
+    
+    def save_resolution(result_idx, result_id, resolution, lines):
+        results[result_idx]['conflict_resolution'] = resolution
+        results[result_idx]['status'] = 'ok'
+        lines.append(orjson.dumps({'index': result_idx, 'id': result_id, 'conflict_resolution': resolution}) + b"\n")
+    
+    async def apply_resolutions(batch, resolutions):
+        # Atualizar os resultados (e as repetições do mesmo conflito) e gravar o progresso
+        lines = []
+        cache_rows = []
+        for k, (result_idx, result_id, conflict_tuple, _) in enumerate(batch, start=1):
+            if k not in resolutions:
+                logger.warning("Resposta sem resolução para o ID %s", result_id)
+                continue
+            
+            save_resolution(result_idx, result_id, resolutions[k], lines)
+            
+            key = get_conflict_key(conflict_tuple)
+            for duplicate_idx, duplicate_id, _, _ in duplicates[key]:
+                save_resolution(duplicate_idx, duplicate_id, resolutions[k], lines)
+            cache_rows.append((model, key, resolutions[k]))
+        if lines:
+            await asyncio.to_thread(write_progress, progress, lines, cache, cache_rows)
+        return len(lines)
+    
+    with open(progress_file, 'ab') as progress:
+        cached_lines = []
+        for key, resolution in cached.items():
+            for result_idx, result_id, _, _ in duplicates[key]:
+                save_resolution(result_idx, result_id, resolution, cached_lines)
+        cached_count = len(cached_lines)
+        if cached_lines:
+            await asyncio.to_thread(write_progress, progress, cached_lines)
+        
+        responses = None
+        if args.use_batch_api and batches:
+            # Processamento offline: um único job, sem limite de requisições por minuto
+            logger.info(f"Enviando {total} requisições pela Batch API")
+            try:
+                responses = await llm_client.generate_content_batch_async(
+                    {str(n): batch_prompt(batch) for n, batch in enumerate(batches, start=1)},
+                    timeout=args.batch_timeout_hours * 3600
+                )
+            except Exception as e:
+                # Job com erro ou sem resposta no prazo (já cancelado): seguir com requisições individuais
+                logger.error(f"Erro no job da Batch API: {str(e)}")
+                logger.warning("Gerando as resoluções com requisições individuais")
+        
+        if responses is not None:
+            updated_count = 0
+            for n, batch in enumerate(batches, start=1):
+                updated_count += await apply_resolutions(batch, parse_response(responses[str(n)]) if str(n) in responses else {})
         else:
-            base_name, ext = os.path.splitext(input_file)
-            output_file = f"{base_name}_fixed{ext}"
+            async def request(prompt, system_instruction, label):
+                # Rate limit e timeout: novas tentativas com backoff exponencial (ou Retry-After)
+                def on_attempt(attempt_number):
+                    if attempt_number > 1:
+                        logger.warning("Nova tentativa (%d) para %s", attempt_number, label)
+                    logger.info("Processando %s", label)
+                
+                response_text, elapsed_time = await call_with_limits(
+                    limiter, llm_client.generate_content_async, prompt,
+                    system_instruction=system_instruction, on_attempt=on_attempt
+                )
+                logger.success("Resolução (%s) gerada em %.2fs", label, elapsed_time)
+                return response_text
+            
+            async def regen_batch(n, batch):
+                label = f"{n}/{total}: ID {', '.join(str(result_id) for _, result_id, _, _ in batch)}"
+                
+                try:
+                    # Criar prompt e gerar nova resolução
+                    resolutions = parse_response(await request(*batch_prompt(batch), label))
+                except Exception as e:
+                    logger.error("Erro ao gerar resolução (%s): %s", label, e)
+                    return 0
+                
+                return await apply_resolutions(batch, resolutions)
+            
+            regenerated = await asyncio.gather(*(regen_batch(n, batch) for n, batch in enumerate(batches, start=1)))
+            updated_count = sum(regenerated)
     
-    # Atualizar metadata
-    metadata.update({
-        'regeneration_timestamp': datetime.now().isoformat(),
-        'regenerated_count': updated_count,
-        'total_records': len(results)
-    })
+    return cached_count + updated_count
+
+async def process_files(input_files, llm_client, args):
+    """
+    Processa até `file_workers` arquivos ao mesmo tempo. Todos compartilham o
+    mesmo rate limiter, então o total de requisições continua dentro do limite
+    do provider, e a mesma conexão com o cache de resoluções.
+    """
+    limiter = AsyncRateLimiter(args.requests_per_minute, args.max_concurrent)
+    semaphore = asyncio.Semaphore(max(1, args.file_workers))
+    # Uma única conexão com o cache, compartilhada por todos os arquivos
+    cache = None if args.no_cache else open_resolution_cache()
     
-    # Salvar resultados
-    output_data = {
-        'metadata': metadata,
-        'results': results
-    }
+    async def run(input_file):
+        async with semaphore:
+            logger.section(f"Processando arquivo: {input_file}")
+            return await process_file(input_file, llm_client, args, limiter, cache)
     
     try:
-        with open(output_file, 'w') as f:
-            json.dump(output_data, f, indent=2)
-        
-        logger.success(f"Resultados salvos em: {output_file}")
-        return output_file
-    except Exception as e:
-        logger.error(f"Erro ao salvar resultados: {str(e)}")
-        return None
+        outcomes = await asyncio.gather(*(run(input_file) for input_file in input_files), return_exceptions=True)
+    finally:
+        # Todas as requisições do loop usaram a mesma conexão; fechá-la antes do loop terminar
+        await llm_client.aclose()
+        if cache is not None:
+            cache.close()
+    
+    # Um arquivo com erro não interrompe os outros
+    for input_file, outcome in zip(input_files, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Erro ao processar {input_file}: {str(outcome)}")
+    return outcomes
 
 def main():
     # Configurar logging
@@ -240,11 +597,20 @@ def main():
         input_files = glob(args.input)
         logger.info(f"Encontrados {len(input_files)} arquivos com o padrão '{args.input}'")
         
-        for input_file in input_files:
-            logger.section(f"Processando arquivo: {input_file}")
-            process_file(input_file, llm_client, args)
+        # Os arquivos são processados ao mesmo tempo: com uma única saída, um
+        # sobrescreveria o outro e o progresso de um seria aplicado ao outro
+        if args.output and len(input_files) > 1:
+            parser.error("--output não pode ser usado quando o padrão --glob encontra mais de um arquivo")
+        
+        # Pré-filtro em paralelo: só carregar os arquivos com algo a regenerar
+        with ThreadPoolExecutor() as executor:
+            pending_files = [f for f, pending in zip(input_files, executor.map(lambda f: needs_regeneration(f, args), input_files)) if pending]
+        if len(pending_files) < len(input_files):
+            logger.info(f"{len(input_files) - len(pending_files)} arquivos sem resoluções com erro ignorados")
+        
+        asyncio.run(process_files(pending_files, llm_client, args))
     else:
-        process_file(args.input, llm_client, args)
+        asyncio.run(process_files([args.input], llm_client, args))
     
     logger.section("Processamento concluído")
 
@@ -1,4 +1,3 @@
-import pandas as pd
 import colorlog
 import logging
 import os
@@ -65,51 +64,80 @@ def setup_logger():
 logger = setup_logger()
 
 
-def add_row_to_dataframe(df, commit_sha, conflict_resolution, id):
+def handle_error(commit_sha, error, id):
     """
-    Adiciona uma nova linha ao DataFrame de resultados.
+    Trata erros durante o processamento e cria o registro de erro correspondente.
     
     Args:
-        df: DataFrame de resultados
         commit_sha: SHA do commit
-        conflict_resolution: Resolução do conflito
-        id: ID do registro
+        error: Exceção capturada
+        id: ID do registro que causou o erro
         
     Returns:
-        DataFrame atualizado
+        dict: Registro marcado com status 'error', com a mensagem de erro também como resolução
     """
-    new_row = pd.DataFrame([{
+    return {
         'id': id,
         'commit_sha': commit_sha,
-        'conflict_resolution': conflict_resolution
-    }])
+        'conflict_resolution': f"Erro ao gerar: {error}",
+        'status': 'error'
+    }
 
-    df = pd.concat([df, new_row], ignore_index=True)
-    return df
 
+def get_project_root():
+    """Get the absolute path to the project root directory"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.dirname(os.path.dirname(current_dir))
 
-def handle_error(df, row, error):
+def read_jsonl(path, nrows=None, columns=None):
     """
-    Trata erros durante o processamento e adiciona uma linha de erro ao DataFrame.
+    Lê um arquivo JSONL em um DataFrame usando o leitor multithread do pyarrow.
+    Se o pyarrow não estiver instalado ou não conseguir inferir o esquema do
+    arquivo, usa o pd.read_json como alternativa.
     
     Args:
-        df: DataFrame de resultados
-        row: Linha que causou o erro
-        error: Exceção capturada
+        path (str): Caminho do arquivo JSONL
+        nrows (int, optional): Número máximo de linhas a serem carregadas
+        columns (list, optional): Colunas a manter (as ausentes no arquivo são ignoradas)
         
     Returns:
-        DataFrame atualizado
+        pandas.DataFrame: DataFrame com os registros do arquivo
     """
-    new_row = pd.DataFrame([{
-        'id': row['id'] if 'id' in row else row.name,
-        'commit_sha': row['commit_sha'],
-        'conflict_resolution': f"Erro ao gerar: {error}"
-    }])
-
-    return pd.concat([df, new_row], ignore_index=True)
-
-
-def get_project_root():
-    """Get the absolute path to the project root directory"""
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    return os.path.dirname(os.path.dirname(current_dir))
\ No newline at end of file
+    import pandas as pd
+    
+    def read_with_pandas():
+        df = pd.read_json(path, lines=True, nrows=nrows)
+        return df[[column for column in columns if column in df.columns]] if columns else df
+    
+    try:
+        import pyarrow as pa
+        import pyarrow.json as pa_json
+    except ImportError:
+        return read_with_pandas()
+    
+    try:
+        if nrows is None or not hasattr(pa_json, 'open_json'):
+            # open_json (leitura em blocos) só existe a partir do pyarrow 20
+            table = pa_json.read_json(path)
+            if nrows is not None:
+                table = table.slice(0, nrows)
+        else:
+            # Lê em blocos e para assim que houver linhas suficientes
+            batches = []
+            loaded = 0
+            with pa_json.open_json(path) as reader:
+                for batch in reader:
+                    batches.append(batch)
+                    loaded += batch.num_rows
+                    if loaded >= nrows:
+                        break
+                table = pa.Table.from_batches(batches, schema=reader.schema).slice(0, nrows)
+    except pa.ArrowInvalid as e:
+        logger.warning(f"pyarrow não conseguiu ler {path} ({e}). Usando pd.read_json.")
+        return read_with_pandas()
+    
+    if columns:
+        table = table.select([column for column in columns if column in table.column_names])
+    
+    # Structs vêm com todas as chaves do esquema (None nas ausentes em cada linha)
+    return table.to_pandas()
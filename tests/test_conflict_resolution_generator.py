@@ -0,0 +1,126 @@
+import asyncio
+import io
+
+import orjson
+import pandas as pd
+
+from src.experiment.conflict_resolution_generator import process_dataframe
+from src.experiment.llm.rate_limiter import AsyncRateLimiter
+from src.experiment.prompt import parse_batch_response
+
+
+def _df(conflict_tuples):
+    n = len(conflict_tuples)
+    return pd.DataFrame({
+        'id': list(range(1, n + 1)),
+        'commit_sha': [f"sha{i}" for i in range(1, n + 1)],
+        'conflict_tuple': conflict_tuples,
+        'commit_message': [f"msg {i}" for i in range(1, n + 1)],
+    })
+
+
+class FakeLLM:
+    """Answers each prompt with its conflict contents; fails on any prompt containing `fail_on`."""
+
+    def __init__(self, fail_on=None, delay=0.0):
+        self.fail_on = fail_on
+        self.delay = delay
+        self.prompts = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def __call__(self, prompt, system_instruction=None):
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail_on is not None and self.fail_on in prompt:
+                raise ValueError("invalid response")
+            if prompt.startswith("<<<ID"):
+                # Batch prompt: echo each conflict back inside its own delimiters
+                return "\n".join(
+                    f"<<<ID {n}>>>\nresolved {text.splitlines()[0]}\n<<<END {n}>>>"
+                    for n, text in sorted(parse_batch_response(prompt).items())
+                )
+            return f"resolved {prompt.splitlines()[0]}"
+        finally:
+            self.in_flight -= 1
+
+
+def _run(df, llm, **kwargs):
+    kwargs.setdefault('limiter', AsyncRateLimiter(60000, kwargs.pop('max_concurrent', 5)))
+    return asyncio.run(process_dataframe(df, llm, **kwargs))
+
+
+def test_requests_run_concurrently_and_keep_row_order():
+    df = _df([{'a_content': f"a{i}"} for i in range(1, 7)])
+    llm = FakeLLM(delay=0.02)
+
+    result, end_index = _run(df, llm, max_concurrent=3)
+
+    assert end_index == 6
+    assert llm.peak == 3
+    assert result['id'].tolist() == [1, 2, 3, 4, 5, 6]
+    assert result['conflict_resolution'].tolist() == [f"resolved A_CONTENT: a{i}" for i in range(1, 7)]
+    assert set(result['status']) == {'ok'}
+
+
+def test_failed_request_becomes_an_error_record_for_its_row_only():
+    df = _df([{'a_content': "a1"}, {'a_content': "boom"}, {'a_content': "a3"}])
+
+    result, _ = _run(df, FakeLLM(fail_on="boom"))
+
+    assert result['status'].tolist() == ['ok', 'error', 'ok']
+    assert result['conflict_resolution'][1].startswith("Erro ao gerar")
+    assert result['commit_sha'][1] == "sha2"
+
+
+def test_start_index_and_max_requests_select_rows():
+    df = _df([{'a_content': f"a{i}"} for i in range(1, 7)])
+
+    result, end_index = _run(df, FakeLLM(), start_index=2, max_requests=3)
+
+    assert end_index == 5
+    assert result['id'].tolist() == [3, 4, 5]
+
+
+def test_batches_pack_several_rows_into_one_request():
+    df = _df([{'a_content': f"a{i}"} for i in range(1, 6)])
+    llm = FakeLLM()
+
+    result, _ = _run(df, llm, batch_size=2)
+
+    assert len(llm.prompts) == 3
+    assert result['conflict_resolution'].tolist() == [f"resolved A_CONTENT: a{i}" for i in range(1, 6)]
+    assert set(result['status']) == {'ok'}
+
+
+def test_invalid_conflict_fails_alone_and_the_rest_of_its_batch_is_sent():
+    df = _df([{'a_content': "a1"}, "not a conflict", {'a_content': "a3"}])
+    llm = FakeLLM()
+
+    result, _ = _run(df, llm, batch_size=3)
+
+    assert len(llm.prompts) == 1
+    assert result['status'].tolist() == ['ok', 'error', 'ok']
+    assert result['conflict_resolution'][0] == "resolved A_CONTENT: a1"
+    assert result['conflict_resolution'][2] == "resolved A_CONTENT: a3"
+
+
+def test_failed_batch_marks_every_row_of_the_batch():
+    df = _df([{'a_content': "a1"}, {'a_content': "boom"}, {'a_content': "a3"}])
+
+    result, _ = _run(df, FakeLLM(fail_on="boom"), batch_size=2)
+
+    assert result['status'].tolist() == ['error', 'error', 'ok']
+
+
+def test_records_are_streamed_to_output_file():
+    df = _df([{'a_content': "a1"}, {'a_content': "boom"}])
+    output = io.BytesIO()
+
+    _run(df, FakeLLM(fail_on="boom"), output_fh=output)
+
+    records = [orjson.loads(line) for line in output.getvalue().splitlines()]
+    assert sorted((record['id'], record['status']) for record in records) == [(1, 'ok'), (2, 'error')]
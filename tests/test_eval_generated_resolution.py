@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from src.experiment.eval.eval_generated_resolution import (
+    SIMILARITY_THRESHOLD,
+    calculate_similarities,
+    calculate_similarity,
+    classify_approaches,
+    normalize_code,
+)
+
+GENERATED = ["int a = 1;", "int b = 2;", "", "return x + y;", "foo();\nbar();", "```java\nint a = 1;\n```"]
+CANDIDATES = [
+    ("int a = 1;", "int b = 2;", "int c = 3;"),
+    ("int a = 1;", "int b = 2;", "int b = 2;"),
+    ("", "x", ""),
+    ("return x;", "return y;", "return 0;"),
+    ("foo();\nbar();", "foo();\nbar();", "foo();\nbar();"),
+    ("int a = 1;", "", "int a = 2;"),
+]
+
+
+def _scalar_approach(a_similarity, b_similarity, base_similarity):
+    # Per-row heuristic the vectorized classification replaced
+    highest = max(a_similarity, b_similarity, base_similarity)
+    if highest > SIMILARITY_THRESHOLD:
+        if highest == a_similarity:
+            return "chose_a"
+        if highest == b_similarity:
+            return "chose_b"
+        return "chose_base"
+    return "custom"
+
+
+def _scalar_scores():
+    return [
+        [calculate_similarity(normalize_code(generated), normalize_code(candidate)) for candidate in candidates]
+        for generated, candidates in zip(GENERATED, CANDIDATES)
+    ]
+
+
+def test_classify_approaches_matches_per_row_heuristic():
+    scores = np.array(_scalar_scores(), dtype=float)
+
+    approaches = classify_approaches(scores[:, 0], scores[:, 1], scores[:, 2])
+
+    assert approaches.tolist() == [_scalar_approach(*row) for row in scores.tolist()]
+    assert approaches.tolist() == ["chose_a", "chose_b", "chose_a", "custom", "chose_a", "chose_a"]
+
+
+def test_classify_approaches_uses_strict_threshold():
+    at_threshold = np.array([SIMILARITY_THRESHOLD, SIMILARITY_THRESHOLD + 0.5])
+
+    assert classify_approaches(at_threshold, np.zeros(2), np.zeros(2)).tolist() == ["custom", "chose_a"]
+
+
+@pytest.mark.parametrize("cutoff", [None, SIMILARITY_THRESHOLD])
+def test_calculate_similarities_matches_scalar_scores(cutoff):
+    for generated, candidates in zip(GENERATED, CANDIDATES):
+        text = normalize_code(generated)
+        normalized = [normalize_code(candidate) for candidate in candidates]
+
+        expected = [calculate_similarity(text, candidate, cutoff=cutoff) for candidate in normalized]
+
+        assert calculate_similarities(text, normalized, cutoff=cutoff) == pytest.approx(expected)
+
+
+def test_calculate_similarities_handles_empty_texts():
+    assert calculate_similarities("", ["", "x"]) == [100.0, 0.0]
+    assert calculate_similarities("x", [""]) == [0.0]
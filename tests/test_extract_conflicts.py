@@ -0,0 +1,56 @@
+import orjson
+import pytest
+
+from src.data_processing.extract_conflicts import _chunk_boundaries, extract_repositories
+
+RECORDS = [
+    {"repository_name": "eclipse/jetty", "n": 1},
+    {"repository_name": "apache/kafka", "n": 2},
+    {"repository_name": "Eclipse/che", "n": 3},
+    {"repository_name": "elastic/elasticsearch", "n": 4, "note": "eclipse/ in another field"},
+    {"repository_name": "eclipse/" + "x" * 200, "n": 5},
+    {"repository_name": "eclipse/last", "n": 6},
+]
+
+
+def _write(path, records, trailing_newline=True):
+    content = b"\n".join(orjson.dumps(record) for record in records)
+    path.write_bytes(content + b"\n" if trailing_newline else content)
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_chunks_cover_the_file_and_end_on_line_breaks(tmp_path, chunk_size, trailing_newline):
+    path = _write(tmp_path / "in.jsonl", RECORDS, trailing_newline)
+    content = (tmp_path / "in.jsonl").read_bytes()
+
+    boundaries = _chunk_boundaries(path, chunk_size)
+
+    assert boundaries[0][0] == 0
+    assert boundaries[-1][1] == len(content)
+    assert all(hi == next_lo for (_, hi), (next_lo, _) in zip(boundaries, boundaries[1:]))
+    assert all(content[hi - 1:hi] == b"\n" for _, hi in boundaries[:-1])
+    # Every line lands whole in exactly one chunk
+    lines = [line for lo, hi in boundaries for line in content[lo:hi].splitlines()]
+    assert lines == content.splitlines()
+
+
+def test_chunk_boundaries_of_empty_file(tmp_path):
+    path = tmp_path / "empty.jsonl"
+    path.write_bytes(b"")
+
+    assert _chunk_boundaries(str(path), 8) == []
+
+
+@pytest.mark.parametrize("chunk_size", [1, 50, 1 << 20])
+def test_extract_repositories_is_independent_of_chunk_size(tmp_path, chunk_size):
+    first = _write(tmp_path / "a.jsonl", RECORDS)
+    second = _write(tmp_path / "b.jsonl", RECORDS[::-1], trailing_newline=False)
+    output = tmp_path / "out.jsonl"
+
+    extract_repositories([first, second], str(output), "repository_name", "Eclipse/", workers=2, chunk_size=chunk_size)
+
+    records = [orjson.loads(line) for line in output.read_bytes().splitlines()]
+    assert [record["n"] for record in records] == [1, 3, 5, 6, 6, 5, 3, 1]
+    assert [record["id"] for record in records] == list(range(1, 9))
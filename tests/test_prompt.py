@@ -0,0 +1,64 @@
+import pytest
+
+from src.experiment.prompt import (
+    check_conflict_tuple,
+    create_batch_user_prompt,
+    create_user_prompt,
+    parse_batch_response,
+)
+
+
+def test_parse_batch_response_maps_numbers_to_resolutions():
+    response = "<<<ID 1>>>\nint a = 1;\n<<<END 1>>>\n<<<ID 2>>>\nint b = 2;\nint c = 3;\n<<<END 2>>>"
+
+    assert parse_batch_response(response) == {1: "int a = 1;", 2: "int b = 2;\nint c = 3;"}
+
+
+def test_parse_batch_response_skips_missing_and_unterminated_blocks():
+    response = "<<<ID 1>>>\nfoo();\n<<<END 1>>>\n<<<ID 3>>>\nbar();\n"
+
+    assert parse_batch_response(response) == {1: "foo();"}
+
+
+def test_parse_batch_response_requires_matching_end_marker():
+    assert parse_batch_response("<<<ID 1>>>\nfoo();\n<<<END 2>>>") == {}
+
+
+def test_parse_batch_response_handles_empty_response():
+    assert parse_batch_response(None) == {}
+    assert parse_batch_response("") == {}
+
+
+def test_batch_prompt_round_trips_through_parser():
+    rows = [({"a_content": "a1", "b_content": "b1"}, "msg 1"), ({"a_content": "a2"}, "msg 2")]
+
+    prompt = create_batch_user_prompt(rows)
+    parsed = parse_batch_response(prompt)
+
+    assert sorted(parsed) == [1, 2]
+    assert parsed[1] == "A_CONTENT: a1\nB_CONTENT: b1\nBASE_CONTENT: N/A\nCOMMIT_MESSAGE: msg 1"
+
+
+def test_check_conflict_tuple_rejects_non_dict():
+    check_conflict_tuple({"a_content": "x"})
+    with pytest.raises(ValueError):
+        check_conflict_tuple("not a conflict")
+
+
+def test_user_prompt_fills_the_template():
+    conflict = {"a_content": "int a;", "b_content": "int b;", "base_content": "int c;"}
+
+    assert create_user_prompt(conflict, "fix") == "A_CONTENT: int a;\nB_CONTENT: int b;\nBASE_CONTENT: int c;\nCOMMIT_MESSAGE: fix"
+
+
+def test_user_prompt_defaults_missing_contents():
+    prompt = create_user_prompt({"a_content": "x"}, "msg")
+
+    assert prompt == "A_CONTENT: x\nB_CONTENT: N/A\nBASE_CONTENT: N/A\nCOMMIT_MESSAGE: msg"
+
+
+def test_user_prompt_keeps_braces_in_code():
+    prompt = create_user_prompt({"a_content": "if (x) { f({}); }"}, "{msg}")
+
+    assert prompt.startswith("A_CONTENT: if (x) { f({}); }\n")
+    assert prompt.endswith("COMMIT_MESSAGE: {msg}")
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.experiment.llm.rate_limiter import AsyncRateLimiter, call_with_limits
+
+
+def test_rejects_non_positive_limits():
+    with pytest.raises(ValueError):
+        AsyncRateLimiter(0)
+    with pytest.raises(ValueError):
+        AsyncRateLimiter(60, max_concurrent=0)
+
+
+def test_burst_up_to_capacity_then_paced_by_rate():
+    async def run():
+        # 600 RPM = 10 requests/s, bucket of 2 tokens
+        limiter = AsyncRateLimiter(600, max_concurrent=2)
+        start = time.monotonic()
+        stamps = []
+        for _ in range(6):
+            async with limiter:
+                stamps.append(time.monotonic() - start)
+        return stamps
+
+    stamps = asyncio.run(run())
+
+    assert stamps[1] < 0.05
+    # The 4 requests after the burst wait one refill (0.1s) each
+    assert stamps[-1] == pytest.approx(0.4, abs=0.08)
+
+
+def test_limits_requests_in_flight():
+    async def run():
+        limiter = AsyncRateLimiter(60000, max_concurrent=3)
+        in_flight = 0
+        peak = 0
+
+        async def request():
+            nonlocal in_flight, peak
+            async with limiter:
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+        await asyncio.gather(*(request() for _ in range(12)))
+        return peak
+
+    assert asyncio.run(run()) == 3
+
+
+def test_retry_after_header_pauses_new_requests():
+    async def run():
+        limiter = AsyncRateLimiter(60000, max_concurrent=5)
+        limiter.update_from_headers({"retry-after": "0.2"})
+        start = time.monotonic()
+        async with limiter:
+            return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.18
+
+
+def test_exhausted_remaining_header_drains_bucket():
+    async def run():
+        # 6000 RPM = 100 requests/s, so a drained bucket waits ~0.01s
+        limiter = AsyncRateLimiter(6000, max_concurrent=5)
+        limiter.update_from_headers({"x-ratelimit-remaining": "0"})
+        start = time.monotonic()
+        async with limiter:
+            return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.008
+
+
+def _rate_limited(retry_after):
+    request = httpx.Request("POST", "https://example.com")
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+    return httpx.HTTPStatusError("429", request=request, response=response)
+
+
+def test_call_with_limits_retries_rate_limited_calls():
+    async def run():
+        limiter = AsyncRateLimiter(60000, max_concurrent=2)
+        calls = []
+        attempts = []
+
+        async def fn(prompt, system_instruction=None):
+            calls.append((prompt, system_instruction))
+            if len(calls) == 1:
+                raise _rate_limited("0.1")
+            return "done"
+
+        start = time.monotonic()
+        result, elapsed = await call_with_limits(limiter, fn, "p", system_instruction="s", on_attempt=attempts.append)
+        return result, elapsed, calls, attempts, time.monotonic() - start
+
+    result, elapsed, calls, attempts, total = asyncio.run(run())
+
+    assert result == "done"
+    assert elapsed < 0.05
+    assert calls == [("p", "s"), ("p", "s")]
+    assert attempts == [1, 2]
+    # The retry waited for the Retry-After sent with the 429
+    assert total >= 0.09
+
+
+def test_call_with_limits_raises_other_errors_without_retrying():
+    async def run():
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            raise ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            await call_with_limits(AsyncRateLimiter(60000), fn)
+        return calls
+
+    assert asyncio.run(run()) == [1]
@@ -0,0 +1,156 @@
+from types import SimpleNamespace
+
+import orjson
+
+from src.experiment import regenerate_conflicts
+from src.experiment.regenerate_conflicts import (
+    get_conflict_key,
+    group_duplicate_conflicts,
+    identify_failed_resolutions,
+    load_progress,
+    lookup_cached_resolutions,
+    needs_regeneration,
+    open_resolution_cache,
+    write_progress,
+)
+
+
+def _conflict(a, b, base=""):
+    return {"a_content": a, "b_content": b, "base_content": base}
+
+
+def _write_lines(path, records, tail=b""):
+    path.write_bytes(b"".join(orjson.dumps(record) + b"\n" for record in records) + tail)
+
+
+def test_load_progress_applies_matching_records(tmp_path):
+    results = [
+        {"id": 1, "conflict_resolution": "Erro ao gerar: x", "status": "error"},
+        {"id": 2, "conflict_resolution": "Erro ao gerar: y", "status": "error"},
+    ]
+    progress_file = tmp_path / "out.progress.jsonl"
+    _write_lines(progress_file, [{"index": 1, "id": 2, "conflict_resolution": "fixed"}])
+
+    assert load_progress(str(progress_file), results) == 1
+    assert results[0]["status"] == "error"
+    assert results[1] == {"id": 2, "conflict_resolution": "fixed", "status": "ok"}
+
+
+def test_load_progress_ignores_stale_and_truncated_records(tmp_path):
+    results = [{"id": 1, "conflict_resolution": "Erro ao gerar: x"}]
+    progress_file = tmp_path / "out.progress.jsonl"
+    _write_lines(
+        progress_file,
+        [
+            {"index": 0, "id": 99, "conflict_resolution": "other file"},
+            {"index": 5, "id": 1, "conflict_resolution": "out of range"},
+        ],
+        tail=b'{"index": 0, "id": 1, "conflict_res',
+    )
+
+    assert load_progress(str(progress_file), results) == 0
+    assert results[0]["conflict_resolution"] == "Erro ao gerar: x"
+
+
+def test_load_progress_without_file(tmp_path):
+    assert load_progress(str(tmp_path / "missing.progress.jsonl"), []) == 0
+
+
+def test_conflict_key_depends_only_on_contents():
+    assert get_conflict_key(_conflict("a", "b", "c")) == get_conflict_key(dict(_conflict("a", "b", "c"), resolution="r"))
+    assert get_conflict_key(_conflict("a", "b", "c")) != get_conflict_key(_conflict("a", "b", "d"))
+
+
+def test_conflict_key_is_unambiguous_with_separators_in_code():
+    assert get_conflict_key(_conflict("p|", "q")) != get_conflict_key(_conflict("p", "|q"))
+    assert get_conflict_key(_conflict("a || b", "")) != get_conflict_key(_conflict("a ", "| b"))
+
+
+def test_group_duplicate_conflicts_sends_each_conflict_once():
+    entries = [
+        (0, 10, _conflict("p|", "q"), "m"),
+        (1, 11, _conflict("p", "|q"), "m"),
+        (2, 12, _conflict("p|", "q"), "other message"),
+    ]
+
+    pending, cached, duplicates = group_duplicate_conflicts(entries, lambda key: None)
+
+    assert pending == entries[:2]
+    assert cached == {}
+    assert duplicates[get_conflict_key(entries[0][2])] == [entries[2]]
+    assert duplicates[get_conflict_key(entries[1][2])] == []
+
+
+def test_group_duplicate_conflicts_uses_cached_resolutions():
+    hit = _conflict("cached", "x")
+    entries = [(0, 10, hit, "m"), (1, 11, _conflict("new", "x"), "m"), (2, 12, hit, "m")]
+    cache = {get_conflict_key(hit): "resolved"}
+    lookups = []
+
+    def cached_resolution(key):
+        lookups.append(key)
+        return cache.get(key)
+
+    pending, cached, duplicates = group_duplicate_conflicts(entries, cached_resolution)
+
+    assert pending == [entries[1]]
+    assert cached == {get_conflict_key(hit): "resolved"}
+    # Every occurrence of a cached conflict receives the cached resolution
+    assert duplicates[get_conflict_key(hit)] == [entries[0], entries[2]]
+    # The cache is queried once per distinct conflict
+    assert len(lookups) == 2
+
+
+def test_resolution_cache_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(regenerate_conflicts, "get_project_root", lambda: str(tmp_path))
+    key = get_conflict_key(_conflict("a", "b"))
+    cache = open_resolution_cache()
+    try:
+        with open(tmp_path / "out.progress.jsonl", "ab") as progress:
+            write_progress(progress, [b"{}\n"], cache, [("google/m", key, "resolved")])
+
+        assert lookup_cached_resolutions(cache, "google/m", {key, "other"}) == {key: "resolved"}
+        # Resolutions are cached per model
+        assert lookup_cached_resolutions(cache, "openai/m", {key}) == {}
+    finally:
+        cache.close()
+    assert (tmp_path / "out.progress.jsonl").read_bytes() == b"{}\n"
+
+
+def test_identify_failed_resolutions_prefers_status_field():
+    results = [
+        {"conflict_resolution": "Erro ao gerar: legacy"},
+        {"conflict_resolution": "Erro ao gerar: x", "status": "ok"},
+        {"conflict_resolution": "anything", "status": "error"},
+        {"conflict_resolution": None},
+        {"conflict_resolution": "int a;"},
+    ]
+
+    assert identify_failed_resolutions(results) == [0, 2]
+
+
+def test_needs_regeneration_scans_the_raw_file(tmp_path):
+    args = SimpleNamespace(output=None, overwrite=False)
+    failed = tmp_path / "failed.json"
+    failed.write_bytes(orjson.dumps({"results": [{"id": 1, "conflict_resolution": "x", "status": "error"}]}))
+    legacy = tmp_path / "legacy.json"
+    legacy.write_bytes(orjson.dumps([{"id": 1, "conflict_resolution": "Erro ao gerar: timeout"}]))
+    done = tmp_path / "done.json"
+    done.write_bytes(orjson.dumps({"results": [{"id": 1, "conflict_resolution": "int a;", "status": "ok"}]}))
+
+    assert needs_regeneration(str(failed), args)
+    assert needs_regeneration(str(legacy), args)
+    assert not needs_regeneration(str(done), args)
+
+    # Pending progress from an interrupted run still has to be applied
+    (tmp_path / "done_fixed.progress.jsonl").write_bytes(b"")
+    assert needs_regeneration(str(done), args)
+
+
+def test_needs_regeneration_lets_unreadable_files_through(tmp_path):
+    args = SimpleNamespace(output=None, overwrite=False)
+    directory = tmp_path / "results.json"
+    directory.mkdir()
+
+    assert needs_regeneration(str(directory), args)
+    assert needs_regeneration(str(tmp_path / "deleted.json"), args)
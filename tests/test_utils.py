@@ -0,0 +1,38 @@
+import pandas as pd
+
+from src.experiment.prompt import create_user_prompt
+from src.experiment.utils import read_jsonl
+
+ROWS = (
+    b'{"id": 1, "commit_message": "m1", "conflict_tuple": {"a_content": "a", "b_content": "b", "base_content": "c"}}\n'
+    b'{"id": 2, "commit_message": "m2", "conflict_tuple": {"a_content": "a"}}\n'
+    b'{"id": 3, "commit_message": "m3", "conflict_tuple": {"a_content": null, "b_content": "b", "base_content": null}}\n'
+)
+
+
+def _prompts(df):
+    return [create_user_prompt(conflict_tuple, message) for conflict_tuple, message in zip(df['conflict_tuple'], df['commit_message'])]
+
+
+def test_read_jsonl_matches_pandas_with_missing_keys_and_nulls(tmp_path):
+    path = tmp_path / "conflicts.jsonl"
+    path.write_bytes(ROWS)
+
+    df = read_jsonl(str(path))
+    expected = pd.read_json(str(path), lines=True)
+
+    assert df['id'].tolist() == expected['id'].tolist()
+    assert df['commit_message'].tolist() == expected['commit_message'].tolist()
+    # Missing keys and explicit nulls both render as "N/A", whichever reader was used
+    assert _prompts(df) == _prompts(expected)
+    assert _prompts(df)[2] == "A_CONTENT: N/A\nB_CONTENT: b\nBASE_CONTENT: N/A\nCOMMIT_MESSAGE: m3"
+
+
+def test_read_jsonl_limits_rows_and_columns(tmp_path):
+    path = tmp_path / "conflicts.jsonl"
+    path.write_bytes(ROWS)
+
+    df = read_jsonl(str(path), nrows=2, columns=['id', 'conflict_tuple', 'missing'])
+
+    assert list(df.columns) == ['id', 'conflict_tuple']
+    assert df['id'].tolist() == [1, 2]